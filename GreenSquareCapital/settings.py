@@ -113,6 +113,38 @@ if database_url:
         ssl_require=not DEBUG,
     )
 
+# Cache: Redis when REDIS_URL is set so every gunicorn worker sees the
+# same entries (and invalidations); local memory for development.
+# The "dashboard" alias holds per-user pledge data that is invalidated on
+# write, which only reaches every worker through a shared backend, so
+# without REDIS_URL it is a no-op cache and the dashboard reads live data
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "dashboard": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
+}
+
+redis_url = os.environ.get("REDIS_URL")
+if redis_url:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": redis_url,
+    }
+    CACHES["dashboard"] = CACHES["default"]
+
+# Password hashing: Argon2 first (much cheaper per login than Django's
+# 1M-iteration PBKDF2 at comparable strength); the rest verify old hashes
+PASSWORD_HASHERS = [
+    "users.hashers.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 # Password validation rules
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -147,6 +179,18 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Upload limits
+# Largest single file accepted (the 10MB document limit in listings.views);
+# BoundedUploadHandler aborts bigger files before they spool to disk
+MAX_UPLOAD_FILE_SIZE = 10 * 1024 * 1024
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2_621_440  # 2.5MB, larger files go to a temp file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2_621_440  # 2.5MB of non-file form data
+FILE_UPLOAD_HANDLERS = [
+    "listings.uploadhandlers.BoundedUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 # Cloudinary configuration
 CLOUDINARY_URL = os.environ.get("CLOUDINARY_URL", "")
 CLOUDINARY_STORAGE = {"RESOURCE_TYPE": "auto"}
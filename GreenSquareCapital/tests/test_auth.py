@@ -0,0 +1,171 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest.mock import patch
+
+from users.backends import EmailBackend
+
+User = get_user_model()
+
+
+class RegisterTests(TestCase):
+    def setUp(self):
+        # Existing account registered through the normal flow (username = email)
+        self.existing = User.objects.create_user(
+            username="taken@example.com",
+            email="taken@example.com",
+            password="Password123!",
+        )
+
+    def _register(self, email):
+        return self.client.post(
+            reverse("users:register"),
+            data={
+                "first_name": "New",
+                "last_name": "User",
+                "email": email,
+                "password1": "Str0ng-Passw0rd!",
+                "password2": "Str0ng-Passw0rd!",
+                "register_submit": "1",
+            },
+        )
+
+    def test_register_creates_user_and_redirects_dashboard(self):
+        # Successful registration logs in and uses email as username
+        resp = self._register("New@Example.com")
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, reverse("users:dashboard"))
+        self.assertTrue(User.objects.filter(username="new@example.com").exists())
+
+    def test_register_duplicate_email_shows_form_error(self):
+        # Duplicate emails are rejected via the unique username constraint
+        resp = self._register("Taken@Example.com")
+        self.assertEqual(resp.status_code, 200)
+        form = resp.context["register_form"]
+        self.assertIn("already exists", " ".join(form.errors["email"]))
+        self.assertEqual(User.objects.filter(email__iexact="taken@example.com").count(), 1)
+
+    def test_register_does_not_pre_query_email(self):
+        # Uniqueness is left to the index; no SELECT on email before INSERT
+        with CaptureQueriesContext(connection) as ctx:
+            self._register("fresh@example.com")
+        self.assertFalse(
+            any("email" in q["sql"].lower() and q["sql"].lstrip().upper().startswith("SELECT")
+                for q in ctx.captured_queries)
+        )
+
+    def test_register_duplicate_email_with_different_username_rejected(self):
+        # Accounts whose username isn't their email (e.g. admin users) still
+        # block a sign-up with the same email, via the LOWER(email) index
+        User.objects.create_user(
+            username="owner1", email="owner1@example.com", password="Password123!"
+        )
+        resp = self._register("Owner1@Example.com")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("already exists", " ".join(resp.context["register_form"].errors["email"]))
+        self.assertEqual(User.objects.filter(email__iexact="owner1@example.com").count(), 1)
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        # Registered account (username = email)
+        self.user = User.objects.create_user(
+            username="member@example.com",
+            email="member@example.com",
+            password="Password123!",
+        )
+
+    def _login(self, email, password):
+        return self.client.post(
+            reverse("users:login"),
+            data={"username": email, "password": password, "login_submit": "1"},
+        )
+
+    def _messages(self, resp):
+        return [m.message for m in get_messages(resp.wsgi_request)]
+
+    def test_login_success_redirects_dashboard(self):
+        # Valid credentials log the user in (email is case-insensitive)
+        resp = self._login("Member@Example.com", "Password123!")
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, reverse("users:dashboard"))
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.user.pk)
+        # No flash message: the dashboard itself confirms the login
+        self.assertNotIn("messages", resp.cookies)
+
+    def test_login_wrong_password_shows_error(self):
+        # Wrong password re-renders the page with an error and the email kept
+        resp = self._login("member@example.com", "WRONG")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("_auth_user_id", self.client.session)
+        self.assertIn("Invalid email or password.", self._messages(resp))
+        self.assertContains(resp, 'value="member@example.com"')
+
+    def test_login_unknown_email_shows_error(self):
+        # Unknown email gets the same generic message as a wrong password
+        resp = self._login("nobody@example.com", "Password123!")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("_auth_user_id", self.client.session)
+        self.assertIn("Invalid email or password.", self._messages(resp))
+
+    def test_unknown_email_still_runs_password_hasher(self):
+        # Backend hashes on a miss so response time doesn't reveal accounts
+        with patch("users.backends.User.set_password") as mock_set_password:
+            self._login("nobody@example.com", "Password123!")
+        mock_set_password.assert_called_with("Password123!")
+
+    def test_login_upgrades_legacy_pbkdf2_hash(self):
+        # Existing PBKDF2 hashes are rehashed with Argon2 on next login
+        self.user.password = make_password("Password123!", hasher="pbkdf2_sha256")
+        self.user.save(update_fields=["password"])
+
+        self._login("member@example.com", "Password123!")
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("argon2$"))
+        self.assertTrue(self.user.check_password("Password123!"))
+
+    def test_login_records_last_login_without_user_save(self):
+        # last_login is written with a single UPDATE, not a model save
+        saved = []
+
+        def on_save(sender, instance, **kwargs):
+            saved.append(instance.pk)
+
+        post_save.connect(on_save, sender=User)
+        try:
+            self._login("member@example.com", "Password123!")
+        finally:
+            post_save.disconnect(on_save, sender=User)
+
+        self.assertEqual(saved, [])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+
+class EmailBackendGetUserTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="member@example.com",
+            email="member@example.com",
+            password="Password123!",
+            first_name="Mem",
+        )
+
+    def test_get_user_loads_narrow_row(self):
+        # Session user is fetched with only the columns requests read
+        user = EmailBackend().get_user(self.user.pk)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIn("date_joined", user.get_deferred_fields())
+        with self.assertNumQueries(0):
+            self.assertEqual((user.first_name, user.email), ("Mem", "member@example.com"))
+
+    def test_get_user_rejects_inactive(self):
+        # Inactive accounts are still refused
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(EmailBackend().get_user(self.user.pk))
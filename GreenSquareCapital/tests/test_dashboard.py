@@ -0,0 +1,223 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from investments.models import Investment
+from listings.models import Listing, ListingMedia
+from users.services import cached_dashboard_headline, dashboard_headline
+from users.views import DASHBOARD_INVESTMENTS, DASHBOARD_LISTINGS
+
+User = get_user_model()
+
+# Stand-in for the shared (Redis) backend used when REDIS_URL is set; the
+# default settings give the dashboard alias a dummy cache
+SHARED_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "dashboard": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "dashboard",
+    },
+}
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class DashboardTests(TestCase):
+    def setUp(self):
+        # Cached headline figures must not leak between tests
+        for alias in SHARED_CACHES:
+            caches[alias].clear()
+
+        # Dashboard owner with a mix of listing states and pledges
+        self.user = User.objects.create_user(
+            username="user@example.com", email="user@example.com", password="Password123!"
+        )
+        self.other = User.objects.create_user(
+            username="other@example.com", email="other@example.com", password="Password123!"
+        )
+
+        Listing.objects.create(owner=self.user, status=Listing.Status.ACTIVE)
+        Listing.objects.create(owner=self.user, status=Listing.Status.DRAFT)
+        Listing.objects.create(owner=self.user, status=Listing.Status.PENDING_PAYMENT)
+        Listing.objects.create(owner=self.user, status=Listing.Status.EXPIRED)
+
+        # Another user's listings should never count towards this dashboard
+        Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE)
+
+        opp_a = Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE)
+        opp_b = Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE)
+
+        # Two pledges on one listing, one on another, one cancelled
+        Investment.objects.create(investor=self.user, listing=opp_a, amount_pence=150000)
+        Investment.objects.create(investor=self.user, listing=opp_a, amount_pence=5)
+        Investment.objects.create(investor=self.user, listing=opp_b, amount_pence=100)
+        Investment.objects.create(
+            investor=self.user,
+            listing=opp_b,
+            amount_pence=999999,
+            status=Investment.Status.CANCELLED,
+        )
+
+    def test_dashboard_requires_login(self):
+        # Anonymous users are sent to login
+        resp = self.client.get(reverse("users:dashboard"))
+        self.assertEqual(resp.status_code, 302)
+        self.assertIn(reverse("users:login"), resp.url)
+
+    def test_dashboard_headline_figures(self):
+        # Counts and totals only include this user's rows and PLEDGED investments
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("users:dashboard"))
+        self.assertEqual(resp.status_code, 200)
+
+        self.assertEqual(resp.context["active_listings"], 1)
+        self.assertEqual(resp.context["draft_waiting_payment"], 2)
+        self.assertEqual(resp.context["active_investments"], 2)
+        self.assertEqual(resp.context["total_pledged"], "£1,501.05")
+
+        self.assertEqual(len(resp.context["listings"]), 4)
+        self.assertEqual(len(resp.context["investments"]), 3)
+
+    def test_headline_is_one_query(self):
+        # Pledge total and distinct listing count come from one aggregate
+        with self.assertNumQueries(1):
+            headline = dashboard_headline(self.user)
+
+        self.assertEqual(
+            headline,
+            {"total_pledged_pence": 150105, "active_investments": 2},
+        )
+
+    def test_headline_for_user_without_pledges_is_zero(self):
+        # An empty SUM coalesces to 0 rather than None
+        headline = dashboard_headline(self.other)
+        self.assertEqual(headline["total_pledged_pence"], 0)
+        self.assertEqual(headline["active_investments"], 0)
+
+    def test_cached_headline_invalidated_by_new_pledge(self):
+        # Repeat loads hit the cache; a new pledge drops the cached entry
+        cached_dashboard_headline(self.user)
+        with self.assertNumQueries(0):
+            cached_dashboard_headline(self.user)
+
+        opp = Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE)
+        with self.captureOnCommitCallbacks(execute=True):
+            Investment.objects.create(investor=self.user, listing=opp, amount_pence=95)
+
+        headline = cached_dashboard_headline(self.user)
+        self.assertEqual(headline["total_pledged_pence"], 150200)
+        self.assertEqual(headline["active_investments"], 3)
+
+    def test_cached_headline_invalidated_only_after_commit(self):
+        # A read inside the pledge's transaction must not be what stays
+        # cached; the entry is dropped once the pledge commits
+        cached_dashboard_headline(self.user)
+        opp = Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Investment.objects.create(investor=self.user, listing=opp, amount_pence=95)
+                before_commit = cached_dashboard_headline(self.user)
+
+        self.assertEqual(before_commit["total_pledged_pence"], 150105)
+        self.assertEqual(cached_dashboard_headline(self.user)["total_pledged_pence"], 150200)
+
+    def test_listing_cards_show_media_count(self):
+        # Media is counted in the listings query, not prefetched
+        listing = Listing.objects.filter(owner=self.user, status=Listing.Status.DRAFT).get()
+        for name in ("a.jpg", "b.jpg"):
+            ListingMedia.objects.create(
+                listing=listing,
+                file=SimpleUploadedFile(name, b"fake", content_type="image/jpeg"),
+                media_type=ListingMedia.MediaType.IMAGE,
+            )
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("users:dashboard"))
+
+        counts = {l["id"]: l["media_count"] for l in resp.context["listings"]}
+        self.assertEqual(counts[listing.pk], 2)
+        self.assertContains(resp, "2 files uploaded")
+
+    def test_listing_cards_are_plain_rows_with_labels(self):
+        # Cards render from dicts with choice labels resolved in the view
+        Listing.objects.filter(owner=self.user, status=Listing.Status.DRAFT).update(
+            funding_band=Listing.FundingBand.B10_20,
+            return_type=Listing.ReturnType.EQUITY,
+        )
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("users:dashboard"))
+
+        row = next(l for l in resp.context["listings"] if l["status"] == Listing.Status.DRAFT)
+        self.assertEqual(row["funding_band_label"], "£10,000 - £20,000")
+        self.assertEqual(row["return_type_label"], "Equity Share")
+        self.assertContains(resp, "Equity Share")
+        self.assertContains(resp, reverse("listings:edit_listing", args=[row["id"]]))
+
+    def test_investment_cards_fragment_is_cached_and_invalidated(self):
+        # Warm loads skip the investments query; a new pledge shows up at once
+        self.client.force_login(self.user)
+        url = reverse("users:dashboard")
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertFalse(any("investments_investment" in q["sql"] for q in ctx.captured_queries))
+
+        opp = Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE, project_duration_days=321)
+        with self.captureOnCommitCallbacks(execute=True):
+            Investment.objects.create(investor=self.user, listing=opp, amount_pence=95)
+        self.assertContains(self.client.get(url), "Project duration: 321 days")
+
+    def test_investment_cards_fragment_invalidated_only_after_commit(self):
+        # A render inside the pledge's transaction keeps serving the cached
+        # cards; the fragment is dropped once the pledge commits
+        self.client.force_login(self.user)
+        url = reverse("users:dashboard")
+        self.client.get(url)
+        opp = Listing.objects.create(owner=self.other, status=Listing.Status.ACTIVE, project_duration_days=321)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Investment.objects.create(investor=self.user, listing=opp, amount_pence=95)
+                self.assertNotContains(self.client.get(url), "Project duration: 321 days")
+
+        self.assertContains(self.client.get(url), "Project duration: 321 days")
+
+    def test_module_level_querysets_are_never_evaluated(self):
+        # Shared base querysets must not cache rows across requests
+        self.client.force_login(self.user)
+        self.client.get(reverse("users:dashboard"))
+        self.assertIsNone(DASHBOARD_LISTINGS._result_cache)
+        self.assertIsNone(DASHBOARD_INVESTMENTS._result_cache)
+
+
+class DashboardWithoutSharedCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user@example.com", email="user@example.com", password="Password123!"
+        )
+        self.opp = Listing.objects.create(owner=self.user, status=Listing.Status.ACTIVE)
+
+    def test_headline_is_not_cached_per_process(self):
+        # Without REDIS_URL each worker would hold its own stale copy, so
+        # the figures are read live on every load
+        cached_dashboard_headline(self.user)
+        with self.assertNumQueries(1):
+            cached_dashboard_headline(self.user)
+
+        # No on-commit invalidation needed for the new pledge to show
+        Investment.objects.create(investor=self.user, listing=self.opp, amount_pence=95)
+        self.assertEqual(cached_dashboard_headline(self.user)["total_pledged_pence"], 95)
+
+    def test_investment_cards_are_not_cached_per_process(self):
+        # Without REDIS_URL a pledge shows on the next load from any worker
+        self.client.force_login(self.user)
+        url = reverse("users:dashboard")
+        self.client.get(url)
+
+        opp = Listing.objects.create(owner=self.user, status=Listing.Status.ACTIVE, project_duration_days=321)
+        Investment.objects.create(investor=self.user, listing=opp, amount_pence=95)
+        self.assertContains(self.client.get(url), "Project duration: 321 days")
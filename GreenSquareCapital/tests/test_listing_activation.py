@@ -5,11 +5,17 @@ from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
-from django.urls import reverse
+from django.urls import include, path, reverse
 from django.utils import timezone
 from unittest.mock import patch
 
 from listings.models import Listing, ListingMedia
+from listings import views as listing_views
+from listings.services.payments import (
+    _payment_paths,
+    build_stripe_urls,
+    try_reuse_existing_checkout_session,
+)
 
 User = get_user_model()
 
@@ -103,3 +109,127 @@ class ListingActivationTests(TestCase):
         # Checkout view should be called and response returned
         self.assertEqual(resp.status_code, 200)
         mock_checkout.assert_called_once()
+
+
+class _FakeSession(dict):
+    # Stripe objects support both attribute and key access
+    __getattr__ = dict.get
+
+
+class ReuseCheckoutSessionTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username="owner1", email="owner1@example.com", password="Password123!"
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            status=Listing.Status.DRAFT,
+            duration_days=7,
+            expected_amount_pence=1393,
+            stripe_checkout_session_id="cs_test_done",
+        )
+
+    @patch("listings.services.payments.stripe.checkout.Session.retrieve")
+    def test_completed_session_activates_with_single_retrieve(self, mock_retrieve):
+        # A completed session is activated from the first retrieve only
+        mock_retrieve.return_value = _FakeSession(
+            id="cs_test_done",
+            status="complete",
+            payment_status="paid",
+            amount_total=1393,
+            payment_intent="pi_123",
+        )
+
+        self.assertIsNone(try_reuse_existing_checkout_session(listing=self.listing))
+
+        mock_retrieve.assert_called_once_with("cs_test_done")
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.status, Listing.Status.ACTIVE)
+
+
+class CancelRouteWithDigitsUrls:
+    # URLconf whose cancel route has a literal 0 after the pk
+    urlpatterns = [
+        path("", include(([
+            path("payments/success/", listing_views.payment_success_view, name="payment_success"),
+            path("payments/<int:pk>/cancel-v0/", listing_views.payment_cancel_view, name="payment_cancel"),
+        ], "listings"))),
+    ]
+
+
+class BuildStripeUrlsTests(TestCase):
+    def setUp(self):
+        # Path templates are cached per process; start each test fresh
+        _payment_paths.cache_clear()
+        self.addCleanup(_payment_paths.cache_clear)
+
+    def test_urls_match_reverse(self):
+        # Cached path templates must agree with the URLconf for any pk
+        owner = User.objects.create_user(
+            username="owner1", email="owner1@example.com", password="Password123!"
+        )
+        for _ in range(2):
+            listing = Listing.objects.create(owner=owner)
+            with self.settings(SITE_URL="https://example.com"):
+                success_url, cancel_url = build_stripe_urls(listing=listing)
+
+            self.assertEqual(
+                success_url,
+                "https://example.com" + reverse("listings:payment_success")
+                + f"?listing_id={listing.pk}&session_id={{CHECKOUT_SESSION_ID}}",
+            )
+            self.assertEqual(
+                cancel_url,
+                "https://example.com" + reverse("listings:payment_cancel", kwargs={"pk": listing.pk}),
+            )
+
+    def test_cancel_url_with_digits_after_pk(self):
+        # Only the pk is templated, not other digits in the route
+        listing = Listing(pk=42)
+        with self.settings(SITE_URL="https://example.com", ROOT_URLCONF=CancelRouteWithDigitsUrls):
+            _, cancel_url = build_stripe_urls(listing=listing)
+        self.assertEqual(cancel_url, "https://example.com/payments/42/cancel-v0/")
+
+
+class PaymentCancelTests(TestCase):
+    def setUp(self):
+        # Owner with a draft listing mid-checkout
+        self.owner = User.objects.create_user(
+            username="owner1", email="owner1@example.com", password="Password123!"
+        )
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            status=Listing.Status.DRAFT,
+            expected_amount_pence=1393,
+            stripe_checkout_session_id="cs_test_123",
+        )
+        self.url = reverse("listings:payment_cancel", kwargs={"pk": self.listing.pk})
+
+    def test_cancel_clears_checkout_state(self):
+        # Cancelling resets the expected amount and session id in one UPDATE
+        self.client.force_login(self.owner)
+        resp = self.client.get(self.url)
+
+        self.assertEqual(resp.status_code, 302)
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.status, Listing.Status.DRAFT)
+        self.assertEqual(self.listing.expected_amount_pence, 0)
+        self.assertEqual(self.listing.stripe_checkout_session_id, "")
+
+    def test_cancel_does_not_reset_active_listing(self):
+        # A late cancel after the webhook activated the listing is a no-op
+        Listing.objects.filter(pk=self.listing.pk).update(status=Listing.Status.ACTIVE)
+        self.client.force_login(self.owner)
+        self.client.get(self.url)
+
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.status, Listing.Status.ACTIVE)
+        self.assertEqual(self.listing.stripe_checkout_session_id, "cs_test_123")
+
+    def test_cancel_other_users_listing_404(self):
+        # Non-owners can't touch the listing
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="Password123!"
+        )
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.files.uploadhandler import StopUpload
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
+from unittest.mock import patch
 
 from listings.models import Listing, ListingMedia
+from listings.uploadhandlers import BoundedUploadHandler
 
 User = get_user_model()
 
@@ -88,6 +92,26 @@ class ListingCrudTests(TestCase):
         msgs = [m.message for m in get_messages(resp.wsgi_request)]
         self.assertTrue(any("listing deleted" in m.lower() for m in msgs))
 
+    def test_listing_delete_removes_stored_files(self):
+        # Every backing file is removed from storage, not just the rows
+        self.client.force_login(self.owner)
+        medias = [
+            ListingMedia.objects.create(
+                listing=self.listing,
+                file=SimpleUploadedFile(f"doc{i}.pdf", b"%PDF-", content_type="application/pdf"),
+                media_type=ListingMedia.MediaType.DOCUMENT,
+            )
+            for i in range(3)
+        ]
+        storage = ListingMedia._meta.get_field("file").storage
+        names = [m.file.name for m in medias]
+        self.assertTrue(all(storage.exists(n) for n in names))
+
+        url = reverse("listings:listing_delete", args=[self.listing.pk])
+        self.client.post(url, data={"password": "Password123!"})
+
+        self.assertFalse(any(storage.exists(n) for n in names))
+
     def test_media_delete_requires_draft(self):
         # Media delete should be blocked once a listing is active
         self.client.force_login(self.owner)
@@ -110,3 +134,197 @@ class ListingCrudTests(TestCase):
         self.assertTrue(ListingMedia.objects.filter(pk=media.pk).exists())
         msgs = [m.message for m in get_messages(resp.wsgi_request)]
         self.assertTrue(any("only draft listings can be edited" in m.lower() for m in msgs))
+
+    def test_media_delete_removes_file_on_draft(self):
+        # Owner can delete a file from a draft; lookup is a single query
+        self.client.force_login(self.owner)
+        media = ListingMedia.objects.create(
+            listing=self.listing,
+            file=SimpleUploadedFile("pic.jpg", b"fake", content_type="image/jpeg"),
+            media_type=ListingMedia.MediaType.IMAGE,
+        )
+
+        url = reverse("listings:listing_media_delete", args=[self.listing.pk, media.pk])
+        resp = self.client.post(url)
+
+        self.assertRedirects(resp, reverse("listings:edit_listing", args=[self.listing.pk]), fetch_redirect_response=False)
+        self.assertFalse(ListingMedia.objects.filter(pk=media.pk).exists())
+
+    def test_media_delete_other_users_listing_404(self):
+        # Non-owners get a 404 and the file is kept
+        media = ListingMedia.objects.create(
+            listing=self.listing,
+            file=SimpleUploadedFile("pic.jpg", b"fake", content_type="image/jpeg"),
+            media_type=ListingMedia.MediaType.IMAGE,
+        )
+        self.client.force_login(self.other)
+
+        url = reverse("listings:listing_media_delete", args=[self.listing.pk, media.pk])
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertTrue(ListingMedia.objects.filter(pk=media.pk).exists())
+
+    def test_save_draft_normalises_country(self):
+        # Drafts skip form validation; country is still stored as its key
+        self.client.force_login(self.owner)
+        self.client.post(
+            reverse("listings:create_listing"),
+            data={"action": "save_draft", "project_name": "Cased", "country": " England "},
+        )
+        listing = Listing.objects.get(project_name="Cased")
+        self.assertEqual(listing.country, Listing.Country.ENGLAND)
+
+    def test_uploads_are_stored_outside_the_db_transaction(self):
+        # Slow storage writes must not hold a transaction open
+        self.client.force_login(self.owner)
+        storage = ListingMedia._meta.get_field("file").storage
+        base_depth = len(connection.atomic_blocks)
+        depths = []
+        real_save = storage.save
+
+        def recording_save(*args, **kwargs):
+            depths.append(len(connection.atomic_blocks))
+            return real_save(*args, **kwargs)
+
+        pic = SimpleUploadedFile("pic.png", b"\x89PNG\r\n\x1a\nfake", content_type="image/png")
+        with patch.object(storage, "save", side_effect=recording_save):
+            self.client.post(
+                reverse("listings:create_listing"),
+                data={"action": "save_draft", "project_name": "Outside", "images": [pic]},
+            )
+
+        self.assertEqual(depths, [base_depth])
+        self.assertEqual(Listing.objects.get(project_name="Outside").media.count(), 1)
+
+    def test_failed_media_insert_removes_stored_files_and_new_listing(self):
+        # A rolled-back INSERT leaves no orphaned blobs or empty draft
+        self.client.force_login(self.owner)
+        storage = ListingMedia._meta.get_field("file").storage
+        stored = []
+        real_save = storage.save
+
+        def recording_save(*args, **kwargs):
+            name = real_save(*args, **kwargs)
+            stored.append(name)
+            return name
+
+        pic = SimpleUploadedFile("orphan.png", b"\x89PNG\r\n\x1a\nfake", content_type="image/png")
+        with patch.object(storage, "save", side_effect=recording_save), \
+                patch("listings.views.ListingMedia.objects.bulk_create", side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.client.post(
+                    reverse("listings:create_listing"),
+                    data={"action": "save_draft", "project_name": "Rolled Back", "images": [pic]},
+                )
+
+        self.assertFalse(Listing.objects.filter(project_name="Rolled Back").exists())
+        self.assertEqual(len(stored), 1)
+        self.assertFalse(storage.exists(stored[0]))
+
+    def test_save_draft_persists_uploaded_media(self):
+        # Draft save should store every uploaded image and document
+        self.client.force_login(self.owner)
+
+        images = [
+            SimpleUploadedFile(f"pic{i}.png", b"\x89PNG\r\n\x1a\nfake", content_type="image/png")
+            for i in range(3)
+        ]
+        doc = SimpleUploadedFile("plan.pdf", b"%PDF-1.4 fake", content_type="application/pdf")
+
+        resp = self.client.post(
+            reverse("listings:create_listing"),
+            data={
+                "action": "save_draft",
+                "project_name": "Upload Test",
+                "images": images,
+                "documents": [doc],
+            },
+        )
+        self.assertEqual(resp.status_code, 302)
+
+        listing = Listing.objects.get(owner=self.owner, project_name="Upload Test")
+        media = list(listing.media.order_by("pk"))
+        self.assertEqual(
+            [m.media_type for m in media],
+            [ListingMedia.MediaType.IMAGE] * 3 + [ListingMedia.MediaType.DOCUMENT],
+        )
+        # Files are written under the listing's upload directory
+        for m in media:
+            self.assertTrue(m.file.name.startswith(f"listing_media/listing_{listing.pk}/"))
+            self.assertIsNotNone(m.uploaded_at)
+
+    def test_detail_and_edit_split_media_by_type(self):
+        # Detail and edit pages receive images/documents as separate lists
+        self.client.force_login(self.owner)
+        for name, media_type in (
+            ("a.jpg", ListingMedia.MediaType.IMAGE),
+            ("b.pdf", ListingMedia.MediaType.DOCUMENT),
+            ("c.jpg", ListingMedia.MediaType.IMAGE),
+        ):
+            ListingMedia.objects.create(
+                listing=self.listing,
+                file=SimpleUploadedFile(name, b"fake"),
+                media_type=media_type,
+            )
+
+        for url_name in ("listings:listing_detail", "listings:edit_listing"):
+            resp = self.client.get(reverse(url_name, args=[self.listing.pk]))
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(len(resp.context["images"]), 2)
+            self.assertEqual(len(resp.context["documents"]), 1)
+
+    def test_upload_rejected_when_content_does_not_match_type(self):
+        # A .jpg whose bytes aren't an image is rejected despite its header
+        self.client.force_login(self.owner)
+        spoofed = SimpleUploadedFile("pic.jpg", b"MZ\x90\x00not-an-image", content_type="image/jpeg")
+
+        resp = self.client.post(
+            reverse("listings:create_listing"),
+            data={"action": "save_draft", "project_name": "Spoofed", "images": [spoofed]},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Listing.objects.filter(project_name="Spoofed").exists())
+        msgs = [m.message for m in get_messages(resp.wsgi_request)]
+        self.assertTrue(any("only jpg, png or webp files are allowed" in m.lower() for m in msgs))
+
+    def test_document_without_extension_is_rejected(self):
+        # A bare "pdf" filename has no suffix, even though it reads like one
+        self.client.force_login(self.owner)
+        bare = SimpleUploadedFile("pdf", b"%PDF-1.4 fake", content_type="application/pdf")
+
+        resp = self.client.post(
+            reverse("listings:create_listing"),
+            data={"action": "save_draft", "project_name": "No Suffix", "documents": [bare]},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Listing.objects.filter(project_name="No Suffix").exists())
+
+    def test_oversized_upload_is_stopped_before_saving(self):
+        # Files over MAX_UPLOAD_FILE_SIZE abort the upload and show an error
+        self.client.force_login(self.owner)
+        big = SimpleUploadedFile("plan.pdf", b"%PDF-" + b"0" * 4096, content_type="application/pdf")
+
+        with self.settings(MAX_UPLOAD_FILE_SIZE=1024):
+            resp = self.client.post(
+                reverse("listings:create_listing"),
+                data={"action": "save_draft", "project_name": "Too Big", "documents": [big]},
+            )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Listing.objects.filter(project_name="Too Big").exists())
+        msgs = [m.message for m in get_messages(resp.wsgi_request)]
+        self.assertTrue(any("exceeded" in m.lower() for m in msgs))
+
+    def test_upload_handler_drains_body_instead_of_resetting(self):
+        # A reset would stop real browsers seeing the error page at all
+        request = RequestFactory().post("/")
+        handler = BoundedUploadHandler(request)
+        handler.new_file("documents", "plan.pdf", "application/pdf", 4096)
+
+        with self.settings(MAX_UPLOAD_FILE_SIZE=1024):
+            with self.assertRaises(StopUpload) as cm:
+                handler.receive_data_chunk(b"0" * 2048, 0)
+
+        self.assertFalse(cm.exception.connection_reset)
+        self.assertTrue(request.upload_limit_exceeded)
@@ -8,6 +8,7 @@ from django.utils import timezone
 
 from investments.models import Investment
 from listings.models import Listing, ListingMedia, listing_media_upload_to
+from users.services import expire_due_listings
 
 
 User = get_user_model()
@@ -144,6 +145,19 @@ class ListingModelTests(TestCase):
             expected_until_start - timedelta(seconds=2) <= listing.active_until <= expected_until_start + timedelta(seconds=2)
         )
 
+    def test_activate_is_noop_when_already_active(self):
+        # A replayed activation should not move the active window
+        listing = Listing.objects.create(owner=self.owner, duration_days=7)
+        listing.activate()
+        listing.refresh_from_db()
+        first_from = listing.active_from
+
+        Listing.objects.get(pk=listing.pk).activate()
+        listing.refresh_from_db()
+
+        self.assertEqual(listing.status, Listing.Status.ACTIVE)
+        self.assertEqual(listing.active_from, first_from)
+
     def test_str_uses_project_name_when_present(self):
         # __str__ should show project name when provided
         listing = Listing.objects.create(owner=self.owner, project_name="Old Police Station", status=Listing.Status.DRAFT)
@@ -158,6 +172,44 @@ class ListingModelTests(TestCase):
         self.assertIn(f"Listing {listing.pk}", s)
 
 
+class ExpireDueListingsTests(TestCase):
+    def setUp(self):
+        # Owner with one overdue and one current active listing
+        self.owner = User.objects.create_user(
+            username="owner1",
+            email="owner1@example.com",
+            password="Password123!",
+        )
+        now = timezone.now()
+        self.overdue = Listing.objects.create(
+            owner=self.owner,
+            status=Listing.Status.ACTIVE,
+            active_until=now - timedelta(days=1),
+        )
+        self.current = Listing.objects.create(
+            owner=self.owner,
+            status=Listing.Status.ACTIVE,
+            active_until=now + timedelta(days=1),
+        )
+
+    def test_expires_overdue_and_returns_owner_emails(self):
+        # Only overdue listings expire; payload carries pk and owner email
+        count, expiring = expire_due_listings()
+
+        self.assertEqual(count, 1)
+        self.assertEqual(expiring, [(self.overdue.pk, "owner1@example.com")])
+
+        self.overdue.refresh_from_db()
+        self.current.refresh_from_db()
+        self.assertEqual(self.overdue.status, Listing.Status.EXPIRED)
+        self.assertEqual(self.current.status, Listing.Status.ACTIVE)
+
+    def test_no_due_listings_returns_empty(self):
+        # Running again after expiry is a no-op
+        expire_due_listings()
+        self.assertEqual(expire_due_listings(), (0, []))
+
+
 class ListingMediaModelTests(TestCase):
     def setUp(self):
         # Create owner and listing for media tests
@@ -174,6 +226,12 @@ class ListingMediaModelTests(TestCase):
         path = listing_media_upload_to(media, "photo.jpg")
         self.assertEqual(path, f"listing_media/listing_{self.listing.id}/photo.jpg")
 
+    def test_upload_path_sanitises_filename(self):
+        # Spaces and unsafe characters are normalised in the stored name
+        media = ListingMedia(listing=self.listing, media_type=ListingMedia.MediaType.IMAGE)
+        path = listing_media_upload_to(media, "site plan (v2).pdf")
+        self.assertEqual(path, f"listing_media/listing_{self.listing.id}/site_plan_v2.pdf")
+
     def test_str(self):
         # __str__ should include media type and listing id
         uploaded = SimpleUploadedFile("doc.pdf", b"fake-pdf-bytes", content_type="application/pdf")
@@ -184,3 +242,14 @@ class ListingMediaModelTests(TestCase):
         )
         self.assertIn("document", str(media).lower())
         self.assertIn(str(self.listing.id), str(media))
+
+    def test_str_does_not_query_listing(self):
+        # __str__ should use the raw FK column rather than fetching the listing
+        media = ListingMedia.objects.create(
+            listing=self.listing,
+            media_type=ListingMedia.MediaType.IMAGE,
+            file=SimpleUploadedFile("pic.jpg", b"fake", content_type="image/jpeg"),
+        )
+        fresh = ListingMedia.objects.get(pk=media.pk)
+        with self.assertNumQueries(0):
+            self.assertIn(str(self.listing.id), str(fresh))
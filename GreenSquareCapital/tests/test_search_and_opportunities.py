@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.urls import reverse
 
-from listings.models import Listing
+from listings.models import Listing, ListingMedia
 
 User = get_user_model()
 
@@ -84,6 +85,23 @@ class SearchAndOpportunitiesTests(TestCase):
         listings2 = list(resp2.context["page_obj"].object_list)
         self.assertNotIn(self.active, listings2)
 
+    def test_search_cards_show_media_count(self):
+        # Cards report how many files a listing has without loading them
+        for name in ("a.jpg", "b.pdf"):
+            ListingMedia.objects.create(
+                listing=self.active,
+                file=SimpleUploadedFile(name, b"fake"),
+                media_type=ListingMedia.MediaType.IMAGE,
+            )
+
+        self.client.force_login(self.investor)
+        resp = self.client.get(reverse("listings:search_listings"))
+        self.assertEqual(resp.status_code, 200)
+
+        listing = resp.context["page_obj"].object_list[0]
+        self.assertEqual(listing.media_count, 2)
+        self.assertContains(resp, "2 files uploaded")
+
     def test_opportunity_detail_requires_login(self):
         # Opportunity detail should redirect to login when user is not authenticated
         url = reverse("listings:opportunity_detail", args=[self.active.pk])
@@ -102,3 +120,25 @@ class SearchAndOpportunitiesTests(TestCase):
         url_draft = reverse("listings:opportunity_detail", args=[self.draft.pk])
         resp2 = self.client.get(url_draft)
         self.assertEqual(resp2.status_code, 404)
+
+
+class LocationApiTests(TestCase):
+    def test_counties_are_public_and_cacheable(self):
+        # Anonymous JS fetches get cacheable JSON with an ETag
+        resp = self.client.get(reverse("listings:api_counties"), {"country": "Wales"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {"counties": ["Cardiff", "Swansea", "Gwynedd"]})
+        self.assertIn("max-age=86400", resp["Cache-Control"])
+        self.assertTrue(resp.has_header("ETag"))
+
+    def test_matching_etag_returns_not_modified(self):
+        # Revalidation with the same ETag skips the body
+        url = reverse("listings:api_outcodes")
+        etag = self.client.get(url, {"county": "Kent"})["ETag"]
+        resp = self.client.get(url, {"county": "Kent"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_unknown_key_returns_empty_list(self):
+        # Unknown counties fall back to an empty list
+        resp = self.client.get(reverse("listings:api_outcodes"), {"county": "Nowhere"})
+        self.assertEqual(resp.json(), {"outcodes": []})
@@ -1,3 +1,8 @@
+import hashlib
+import hmac
+import json
+import time
+
 from django.test import TestCase
 from django.urls import reverse
 from unittest.mock import patch
@@ -8,6 +13,16 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+WEBHOOK_SECRET = "whsec_x"
+
+
+def _signed(event, secret=WEBHOOK_SECRET, timestamp=None):
+    # Serialise an event and build a matching Stripe-Signature header
+    payload = json.dumps(event).encode()
+    ts = str(int(time.time()) if timestamp is None else timestamp)
+    sig = hmac.new(secret.encode(), ts.encode() + b"." + payload, hashlib.sha256).hexdigest()
+    return payload, f"t={ts},v1={sig}"
+
 
 class StripeWebhookTests(TestCase):
     def setUp(self):
@@ -35,8 +50,7 @@ class StripeWebhookTests(TestCase):
             self.assertEqual(resp.status_code, 400)
 
     @patch("listings.views.activate_listing_from_paid_session")
-    @patch("listings.views.stripe.Webhook.construct_event")
-    def test_webhook_activates_on_paid_session_completed(self, mock_construct, mock_activate):
+    def test_webhook_activates_on_paid_session_completed(self, mock_activate):
         # Paid checkout.session.completed should trigger activation
         url = reverse("listings:stripe_webhook")
 
@@ -51,14 +65,14 @@ class StripeWebhookTests(TestCase):
                 }
             },
         }
-        mock_construct.return_value = event
+        payload, sig = _signed(event)
 
-        with self.settings(STRIPE_WEBHOOK_SECRET="whsec_x", STRIPE_SECRET_KEY="sk_test_x"):
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
             resp = self.client.post(
                 url,
-                data=b"{}",
+                data=payload,
                 content_type="application/json",
-                HTTP_STRIPE_SIGNATURE="sig",
+                HTTP_STRIPE_SIGNATURE=sig,
             )
 
         # Webhook should return 200 and call activation helper
@@ -66,8 +80,7 @@ class StripeWebhookTests(TestCase):
         mock_activate.assert_called_once()
 
     @patch("listings.views.activate_listing_from_paid_session")
-    @patch("listings.views.stripe.Webhook.construct_event")
-    def test_webhook_ignores_unpaid(self, mock_construct, mock_activate):
+    def test_webhook_ignores_unpaid(self, mock_activate):
         # Unpaid sessions should not activate a listing
         url = reverse("listings:stripe_webhook")
 
@@ -81,14 +94,14 @@ class StripeWebhookTests(TestCase):
                 }
             },
         }
-        mock_construct.return_value = event
+        payload, sig = _signed(event)
 
-        with self.settings(STRIPE_WEBHOOK_SECRET="whsec_x", STRIPE_SECRET_KEY="sk_test_x"):
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
             resp = self.client.post(
                 url,
-                data=b"{}",
+                data=payload,
                 content_type="application/json",
-                HTTP_STRIPE_SIGNATURE="sig"
+                HTTP_STRIPE_SIGNATURE=sig
             )
 
         # Webhook should still return 200, but no activation should occur
@@ -96,8 +109,7 @@ class StripeWebhookTests(TestCase):
         mock_activate.assert_not_called()
 
     @patch("listings.views.activate_listing_from_paid_session")
-    @patch("listings.views.stripe.Webhook.construct_event")
-    def test_webhook_ignores_if_session_id_mismatch(self, mock_construct, mock_activate):
+    def test_webhook_ignores_if_session_id_mismatch(self, mock_activate):
         # Paid sessions should be ignored if the session id does not match the listing record
         url = reverse("listings:stripe_webhook")
 
@@ -111,16 +123,97 @@ class StripeWebhookTests(TestCase):
                 }
             },
         }
-        mock_construct.return_value = event
+        payload, sig = _signed(event)
 
-        with self.settings(STRIPE_WEBHOOK_SECRET="whsec_x", STRIPE_SECRET_KEY="sk_test_x"):
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
             resp = self.client.post(
                 url,
-                data=b"{}",
+                data=payload,
                 content_type="application/json",
-                HTTP_STRIPE_SIGNATURE="sig"
+                HTTP_STRIPE_SIGNATURE=sig
             )
 
         # Webhook should return 200, but no activation should occur
         self.assertEqual(resp.status_code, 200)
         mock_activate.assert_not_called()
+
+    def test_webhook_activation_is_idempotent_on_replay(self):
+        # Paid session activates once; a redelivered event changes nothing
+        self.listing.duration_days = 7
+        self.listing.expected_amount_pence = 1393
+        self.listing.save()
+
+        payload, sig = _signed({
+            "type": "checkout.session.completed",
+            "data": {
+                "object": {
+                    "id": "cs_test_123",
+                    "payment_status": "paid",
+                    "amount_total": 1393,
+                    "payment_intent": "pi_123",
+                    "client_reference_id": str(self.listing.pk),
+                }
+            },
+        })
+        url = reverse("listings:stripe_webhook")
+
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
+            self.client.post(url, data=payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=sig)
+            self.listing.refresh_from_db()
+            first_from = self.listing.active_from
+
+            resp = self.client.post(url, data=payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=sig)
+
+        self.assertEqual(resp.status_code, 200)
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.status, Listing.Status.ACTIVE)
+        self.assertEqual(self.listing.paid_amount_pence, 1393)
+        self.assertEqual(self.listing.stripe_payment_intent_id, "pi_123")
+        self.assertEqual(self.listing.active_from, first_from)
+
+    @patch("listings.views.activate_listing_from_paid_session")
+    def test_webhook_rejects_bad_signature(self, mock_activate):
+        # A body signed with the wrong secret is refused before any processing
+        url = reverse("listings:stripe_webhook")
+        payload, sig = _signed({"type": "checkout.session.completed"}, secret="whsec_other")
+
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
+            resp = self.client.post(url, data=payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=sig)
+
+        self.assertEqual(resp.status_code, 400)
+        mock_activate.assert_not_called()
+
+    @patch("listings.views.activate_listing_from_paid_session")
+    def test_webhook_rejects_non_ascii_signature(self, mock_activate):
+        # A malformed v1 value is a 400, not a TypeError from compare_digest
+        url = reverse("listings:stripe_webhook")
+        payload, _ = _signed({"type": "checkout.session.completed"})
+        sig = f"t={int(time.time())},v1=\xe9\xe9"
+
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
+            resp = self.client.post(url, data=payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=sig)
+
+        self.assertEqual(resp.status_code, 400)
+        mock_activate.assert_not_called()
+
+    def test_webhook_rejects_stale_timestamp(self):
+        # Correctly signed but old deliveries are treated as replays
+        url = reverse("listings:stripe_webhook")
+        payload, sig = _signed({"type": "ping"}, timestamp=int(time.time()) - 3600)
+
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
+            resp = self.client.post(url, data=payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=sig)
+
+        self.assertEqual(resp.status_code, 400)
+
+    @patch("listings.views.orjson.loads")
+    def test_webhook_skips_parsing_ignored_event_types(self, mock_loads):
+        # Verified events of other types are acknowledged without decoding
+        url = reverse("listings:stripe_webhook")
+        payload, sig = _signed({"type": "customer.created", "data": {"object": {}}})
+
+        with self.settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, STRIPE_SECRET_KEY="sk_test_x"):
+            resp = self.client.post(url, data=payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=sig)
+
+        self.assertEqual(resp.status_code, 200)
+        mock_loads.assert_not_called()
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-15 11:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0001_initial'),
+        ('listings', '0004_listing_owner_recent_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='investment',
+            name='investments_investo_5c61c8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['investor', 'status', '-created_at'], name='investments_investo_ebfb43_idx'),
+        ),
+    ]
@@ -44,7 +44,8 @@ class Investment(models.Model):
         # Indexes to optimise common dashboard and listing queries
         indexes = [
             models.Index(fields=["listing", "status"]),
-            models.Index(fields=["investor", "status"]),
+            # Dashboard: investor's pledges by status, newest first
+            models.Index(fields=["investor", "status", "-created_at"]),
         ]
 
     @staticmethod
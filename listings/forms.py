@@ -1,4 +1,3 @@
-from unicodedata import name
 from django import forms
 
 from .models import Listing
@@ -20,6 +19,10 @@ PROJECT_DURATION_CHOICES = [
     (365, "365 days"),
 ]
 
+# Allowed values built once at import rather than per form submission
+_ALLOWED_LISTING_DAYS = frozenset(k for k, _ in LISTING_DURATION_CHOICES)
+_ALLOWED_PROJECT_DAYS = frozenset(k for k, _ in PROJECT_DURATION_CHOICES)
+
 
 class ListingCreateForm(forms.ModelForm):
     """
@@ -142,8 +145,7 @@ class ListingCreateForm(forms.ModelForm):
         - This ensures only the allowed UI options are accepted
         """
         value = self.cleaned_data["duration_days"]
-        allowed = {7, 14, 30, 60}
-        if value not in allowed:
+        if value not in _ALLOWED_LISTING_DAYS:
             raise forms.ValidationError("Select a valid listing duration.")
         return value
 
@@ -152,8 +154,7 @@ class ListingCreateForm(forms.ModelForm):
         Safety check to keep project duration within your allowed UI options.
         """
         value = self.cleaned_data["project_duration_days"]
-        allowed = {60, 120, 200, 365}
-        if value not in allowed:
+        if value not in _ALLOWED_PROJECT_DAYS:
             raise forms.ValidationError("Select a valid project duration.")
         return value
 
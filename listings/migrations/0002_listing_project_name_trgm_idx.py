@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# project_name__icontains compiles to UPPER("project_name"::text) LIKE UPPER(%s)
+# on PostgreSQL; a trigram GIN index on that exact expression lets the
+# substring search use an index instead of a sequential scan.
+INDEX_NAME = "listing_project_name_trgm_idx"
+
+
+def create_trigram_index(apps, schema_editor):
+    # Trigram indexes are PostgreSQL-only; SQLite (local dev/tests) skips this
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON listings_listing "
+        "USING gin ((UPPER(project_name::text)) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-15 10:52
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0002_listing_project_name_trgm_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['-created_at'], name='listing_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['country', 'funding_band', 'return_type'], name='listing_active_filters_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('county', models.TextField())), django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('postcode_prefix', models.TextField())), condition=models.Q(('status', 'active')), name='listing_active_location_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 11:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0003_listing_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['owner', '-created_at'], name='listing_owner_recent_idx'),
+        ),
+    ]
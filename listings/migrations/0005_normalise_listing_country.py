@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Lower
+
+# Search matches country exactly against the lowercase choice keys; drafts
+# saved before country was normalised on write may hold other casings.
+
+
+def lowercase_country(apps, schema_editor):
+    Listing = apps.get_model("listings", "Listing")
+    Listing.objects.filter(country__isnull=False).exclude(
+        country=Lower(F("country"))
+    ).update(country=Lower("country"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_listing_owner_recent_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_country, migrations.RunPython.noop),
+    ]
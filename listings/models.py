@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from datetime import timedelta
+import posixpath
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Cast, Upper
 from django.utils import timezone
+from django.utils.text import get_valid_filename
 
 
 class Listing(models.Model):
@@ -45,6 +48,17 @@ class Listing(models.Model):
         ACTIVE = "active", "Active"
         EXPIRED = "expired", "Expired"
 
+    # Statuses in which the owner may still change a listing
+    EDITABLE_STATUSES = (Status.DRAFT, Status.PENDING_PAYMENT)
+
+    # Choice tuples built once; TextChoices.choices rebuilds a fresh list
+    # on every access, so per-request dropdowns read these instead
+    USE_TYPE_CHOICES = tuple(UseType.choices)
+    COUNTRY_CHOICES = tuple(Country.choices)
+    FUNDING_BAND_CHOICES = tuple(FundingBand.choices)
+    RETURN_TYPE_CHOICES = tuple(ReturnType.choices)
+    RETURN_BAND_CHOICES = tuple(ReturnBand.choices)
+
     # --- Ownership ---
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -157,6 +171,36 @@ class Listing(models.Model):
         default="",
     )
 
+    class Meta:
+        indexes = [
+            # Dashboard: an owner's listings newest first (the status
+            # counts come from the same rows, so status isn't in the key)
+            models.Index(
+                fields=["owner", "-created_at"],
+                name="listing_owner_recent_idx",
+            ),
+            # Search only ever reads ACTIVE listings, so its indexes are partial
+            # Newest-first ordering of the active set
+            models.Index(
+                fields=["-created_at"],
+                name="listing_active_recent_idx",
+                condition=models.Q(status="active"),
+            ),
+            # Low-cardinality dropdown filters, combined in one index
+            models.Index(
+                fields=["country", "funding_band", "return_type"],
+                name="listing_active_filters_idx",
+                condition=models.Q(status="active"),
+            ),
+            # county/postcode use __iexact, i.e. UPPER(col::text) = UPPER(%s)
+            models.Index(
+                Upper(Cast("county", models.TextField())),
+                Upper(Cast("postcode_prefix", models.TextField())),
+                name="listing_active_location_idx",
+                condition=models.Q(status="active"),
+            ),
+        ]
+
     # --- Convenience helpers ---
     def listing_active_days(self) -> int:
         """Safe int value for listing active duration."""
@@ -166,6 +210,10 @@ class Listing(models.Model):
         """Safe int value for project duration."""
         return int(self.project_duration_days or 0)
 
+    def is_editable(self) -> bool:
+        """True while the listing is still a draft (or awaiting payment)."""
+        return self.status in self.EDITABLE_STATUSES
+
     def total_price_pence(self) -> int:
         """
         Listing upload fee. For drafts, duration_days may be None; keep this safe.
@@ -181,16 +229,31 @@ class Listing(models.Model):
 
         Notes:
         - Sets ACTIVE window: active_from = now, active_until = now + duration_days
-        - Saves only the fields that change to keep DB writes tight
+        - Runs as a single conditional UPDATE so concurrent or replayed
+          activations (e.g. Stripe webhook retries) are a no-op in the DB
+        - In-memory fields are only updated when the row actually changed
         """
         if not self.duration_days:
             raise ValueError("Cannot activate listing without duration_days.")
 
         now = timezone.now()
-        self.status = self.Status.ACTIVE
-        self.active_from = now
-        self.active_until = now + timedelta(days=int(self.duration_days))
-        self.save(update_fields=["status", "active_from", "active_until"])
+        active_until = now + timedelta(days=int(self.duration_days))
+
+        with transaction.atomic():
+            updated = (
+                Listing.objects.filter(pk=self.pk)
+                .exclude(status=self.Status.ACTIVE)
+                .update(
+                    status=self.Status.ACTIVE,
+                    active_from=now,
+                    active_until=active_until,
+                )
+            )
+
+        if updated:
+            self.status = self.Status.ACTIVE
+            self.active_from = now
+            self.active_until = active_until
 
     def __str__(self) -> str:
         # Prefer a clean project name; otherwise fall back to "Listing <pk>"
@@ -200,8 +263,13 @@ class Listing(models.Model):
 
 
 def listing_media_upload_to(instance: "ListingMedia", filename: str) -> str:
-    # Upload path keeps media grouped by listing id
-    return f"listing_media/listing_{instance.listing_id}/{filename}"
+    # Upload path keeps media grouped by listing id; listing_id avoids a fetch.
+    # posixpath keeps "/" separators for S3/Cloudinary-style backends.
+    return posixpath.join(
+        "listing_media",
+        f"listing_{instance.listing_id}",
+        get_valid_filename(filename),
+    )
 
 
 class ListingMedia(models.Model):
@@ -1,9 +1,14 @@
 from datetime import timedelta
+from functools import lru_cache
+import hashlib
+import hmac
 import logging
+import time
 
 import stripe
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 
@@ -11,13 +16,20 @@ from ..models import Listing
 
 logger = logging.getLogger(__name__)
 
+# Field values for a listing with no payment in flight; usable with
+# QuerySet.update() as well as reset_payment_state()
+PAYMENT_RESET_VALUES = {
+    "status": Listing.Status.DRAFT,
+    "expected_amount_pence": 0,
+    "paid_amount_pence": 0,
+    "paid_at": None,
+    "stripe_checkout_session_id": "",
+    "stripe_payment_intent_id": "",
+}
+
 def reset_payment_state(listing: Listing) -> None:
-    listing.status = Listing.Status.DRAFT
-    listing.expected_amount_pence = 0
-    listing.paid_amount_pence = 0
-    listing.paid_at = None
-    listing.stripe_checkout_session_id = ""
-    listing.stripe_payment_intent_id = ""
+    for field_name, value in PAYMENT_RESET_VALUES.items():
+        setattr(listing, field_name, value)
 
 def activate_listing_from_paid_session(*, listing: Listing, session: dict) -> bool:
     session_id = session.get("id")
@@ -48,40 +60,103 @@ def activate_listing_from_paid_session(*, listing: Listing, session: dict) -> bo
     # Ensure that duration_days is not None before proceeding with activation
     if listing.duration_days is None:
         raise ValueError("Listing duration is required to activate the listing.")
-    
+
     now = timezone.now()
-    listing.paid_amount_pence = int(amount_total)
-    listing.paid_at = now
-    listing.stripe_payment_intent_id = str(payment_intent or "")
-    listing.status = Listing.Status.ACTIVE
-
-    # Safely convert duration_days to integer
-    duration_days = int(listing.duration_days)
-    listing.active_from = now
-    listing.active_until = now + timedelta(days=duration_days)
-
-    listing.save(
-        update_fields=[
-            "paid_amount_pence",
-            "paid_at",
-            "stripe_payment_intent_id",
-            "status",
-            "active_from",
-            "active_until",
-        ]
+    paid_fields = {
+        "paid_amount_pence": int(amount_total),
+        "paid_at": now,
+        "stripe_payment_intent_id": str(payment_intent or ""),
+        "status": Listing.Status.ACTIVE,
+        "active_from": now,
+        # Safely convert duration_days to integer
+        "active_until": now + timedelta(days=int(listing.duration_days)),
+    }
+
+    # Single conditional UPDATE: session and amount are re-checked in the
+    # WHERE clause, so concurrent or replayed deliveries need no row lock
+    updated = (
+        Listing.objects
+        .filter(pk=listing.pk, expected_amount_pence=int(amount_total))
+        .filter(
+            Q(stripe_checkout_session_id="")
+            | Q(stripe_checkout_session_id=session_id)
+        )
+        .exclude(status=Listing.Status.ACTIVE)
+        .update(**paid_fields)
     )
+    if not updated:
+        # Another delivery may have activated it first
+        return Listing.objects.filter(
+            pk=listing.pk, status=Listing.Status.ACTIVE
+        ).exists()
+
+    for field_name, value in paid_fields.items():
+        setattr(listing, field_name, value)
     return True
 
+# Placeholder pk for reversing the cancel route into a template; distinctive
+# enough not to collide with any literal digits in the route itself
+_CANCEL_PK_SENTINEL = "987654321"
+
+@lru_cache(maxsize=None)
+def _payment_paths() -> tuple[str, str]:
+    # Resolve the redirect paths once (lazily, after the URLconf loads).
+    # The cancel path is reversed with the sentinel pk, then templated
+    success_path = reverse("listings:payment_success")
+    cancel_path = reverse(
+        "listings:payment_cancel", kwargs={"pk": _CANCEL_PK_SENTINEL}
+    )
+    return success_path, cancel_path.replace(_CANCEL_PK_SENTINEL, "{pk}")
+
 def build_stripe_urls(*, listing: Listing) -> tuple[str, str]:
     # Construct the success and cancel URLs for Stripe
+    success_path, cancel_template = _payment_paths()
     success_url = (
         settings.SITE_URL
-        + reverse("listings:payment_success")
+        + success_path
         + f"?listing_id={listing.pk}&session_id={{CHECKOUT_SESSION_ID}}"
     )
-    cancel_url = settings.SITE_URL + reverse("listings:payment_cancel", kwargs={"pk": listing.pk})
+    cancel_url = settings.SITE_URL + cancel_template.format(pk=listing.pk)
     return success_url, cancel_url
 
+def verify_stripe_signature(
+    payload: bytes, sig_header: str, secret: str, tolerance: int = 300
+) -> None:
+    """
+    Check a Stripe-Signature header (t=<ts>,v1=<hmac>[,v1=...]) against the
+    raw body. Same scheme as stripe.Webhook.construct_event, but leaves
+    parsing to the caller so ignored event types needn't be decoded.
+    Raises ValueError on any failure.
+    """
+    timestamp = None
+    signatures = []
+    for item in sig_header.split(","):
+        key, _, value = item.strip().partition("=")
+        if key == "t":
+            timestamp = value
+        elif key == "v1":
+            signatures.append(value)
+
+    if not timestamp or not timestamp.isdigit() or not signatures:
+        raise ValueError("Malformed Stripe-Signature header.")
+
+    # Reject replays of old (or far-future) deliveries
+    if abs(time.time() - int(timestamp)) > tolerance:
+        raise ValueError("Stripe signature timestamp outside tolerance.")
+
+    expected = hmac.new(
+        secret.encode(),
+        timestamp.encode() + b"." + payload,
+        hashlib.sha256,
+    ).hexdigest().encode()
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str, and
+    # header values are latin-1 strings under WSGI (a bad encode is a
+    # UnicodeEncodeError, i.e. still a ValueError)
+    if not any(
+        hmac.compare_digest(expected, sig.encode("latin-1")) for sig in signatures
+    ):
+        raise ValueError("Stripe signature mismatch.")
+
 def ensure_stripe_configured() -> None:
     # Ensure Stripe is properly configured
     if not settings.STRIPE_SECRET_KEY:
@@ -104,15 +179,11 @@ def try_reuse_existing_checkout_session(*, listing: Listing) -> str | None:
             return existing.url
 
         if existing_status == "complete":
-            try:
-                paid_session = stripe.checkout.Session.retrieve(listing.stripe_checkout_session_id)
-            except stripe.error.StripeError:
-                paid_session = None
-
-            if paid_session:
-                with transaction.atomic():
-                    locked = Listing.objects.select_for_update().get(pk=listing.pk)
-                    activate_listing_from_paid_session(listing=locked, session=paid_session)
+            # The session we just retrieved is already the completed one;
+            # no second Stripe round-trip needed before activating
+            with transaction.atomic():
+                locked = Listing.objects.select_for_update().get(pk=listing.pk)
+                activate_listing_from_paid_session(listing=locked, session=existing)
 
     except stripe.error.StripeError as e:
         logger.warning(
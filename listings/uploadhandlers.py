@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+
+class BoundedUploadHandler(FileUploadHandler):
+    """
+    First handler in FILE_UPLOAD_HANDLERS: passes chunks through to the
+    default handlers, but aborts the upload as soon as a single file grows
+    past settings.MAX_UPLOAD_FILE_SIZE, so oversized files never spool to
+    disk. Flags the request so views can report the rejection.
+
+    The rest of the body is read and discarded (not spooled) rather than
+    resetting the connection, so browsers get the rendered error page.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.MAX_UPLOAD_FILE_SIZE:
+            if self.request is not None:
+                self.request.upload_limit_exceeded = True
+            raise StopUpload(connection_reset=False)
+        # Hand the chunk on to the memory/temporary-file handlers
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Later handlers build the UploadedFile
+        return None
@@ -1,9 +1,12 @@
 from __future__ import annotations  # Allows forward refs in type hints
 
-from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, ROUND_HALF_UP
+import hashlib
 import logging
 
+# Fast JSON for location payloads and webhook events
+import orjson
 # Stripe SDK used for checkout and webhook verification
 import stripe
 
@@ -15,15 +18,14 @@ from django.contrib.auth.decorators import login_required
 # Pagination for search results
 from django.core.paginator import Paginator
 from django.db import transaction, models
-from django.db.models import Q, Sum
+from django.db.models import Count, Prefetch, Q, Sum
 # Safer SUM default (0) when no rows
 from django.db.models.functions import Coalesce
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import timezone
 # Stripe webhook is CSRF-exempt
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import condition, require_GET, require_POST
 # Used for pledge progress aggregation
 from investments.models import Investment
 # Draft form and multi-upload form
@@ -36,6 +38,7 @@ from .services.pricing import (
 )
 from .services.payments import (
     # Clears payment fields and status back to DRAFT
+    PAYMENT_RESET_VALUES,
     reset_payment_state,
     # Activates listing once Stripe confirms paid
     activate_listing_from_paid_session,
@@ -45,6 +48,8 @@ from .services.payments import (
     build_stripe_urls,
     # Avoids creating new sessions unnecessarily
     try_reuse_existing_checkout_session,
+    # Checks the webhook HMAC against the raw body
+    verify_stripe_signature,
 )
 # Module logger (handy for debugging in production)
 logger = logging.getLogger(__name__)
@@ -54,15 +59,55 @@ MAX_IMAGE_SIZE = 5 * 1024 * 1024          # 5MB per image
 MAX_DOCUMENT_SIZE = 10 * 1024 * 1024      # 10MB per document
 
 # Allowed image suffixes
-ALLOWED_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "webp"}
+ALLOWED_IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "webp"})
 # Allowed document suffixes
-ALLOWED_DOCUMENT_EXTENSIONS = {"pdf", "doc", "docx"}
+ALLOWED_DOCUMENT_EXTENSIONS = frozenset({"pdf", "doc", "docx"})
 
-ALLOWED_DOCUMENT_MIME_TYPES = {
+ALLOWED_DOCUMENT_MIME_TYPES = frozenset({
     "application/pdf",
     "application/msword",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-}
+})
+
+# Parallel storage deletes when a listing with many files is removed
+STORAGE_DELETE_WORKERS = 8
+
+# Bytes read from the start of each upload for type sniffing
+MIME_SNIFF_BYTES = 512
+
+# Leading magic bytes -> MIME type (client Content-Type is not trusted)
+MAGIC_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"%PDF-", "application/pdf"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+    (
+        b"PK\x03\x04",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ),
+)
+
+# Raw-bytes check for the only webhook event type we act on
+WEBHOOK_EVENT_PROBE = b'"checkout.session.completed"'
+
+# Columns rendered on search result cards
+SEARCH_CARD_FIELDS = (
+    "id",
+    "project_name",
+    "source_use",
+    "target_use",
+    "country",
+    "county",
+    "postcode_prefix",
+    "funding_band",
+    "return_type",
+    "return_band",
+    "duration_days",
+    "created_at",
+    "owner__first_name",
+    "owner__last_name",
+    "owner__email",
+)
 
 # --- Simple static location data used by JS dropdown APIs ---
 COUNTIES_BY_COUNTRY = {
@@ -86,6 +131,29 @@ OUTCODES_BY_COUNTY = {
     "Gwynedd": ["LL"],
 }
 
+# Location API responses are serialised once at import, with ETags,
+# since the dicts above are constant for the life of the process
+_COUNTIES_JSON = {
+    country: orjson.dumps({"counties": counties})
+    for country, counties in COUNTIES_BY_COUNTRY.items()
+}
+_OUTCODES_JSON = {
+    county: orjson.dumps({"outcodes": outcodes})
+    for county, outcodes in OUTCODES_BY_COUNTY.items()
+}
+_NO_COUNTIES_JSON = orjson.dumps({"counties": []})
+_NO_OUTCODES_JSON = orjson.dumps({"outcodes": []})
+_LOCATION_ETAGS = {
+    body: hashlib.sha1(body).hexdigest()
+    for body in (
+        *_COUNTIES_JSON.values(),
+        *_OUTCODES_JSON.values(),
+        _NO_COUNTIES_JSON,
+        _NO_OUTCODES_JSON,
+    )
+}
+LOCATION_API_CACHE_CONTROL = "public, max-age=86400, immutable"
+
 
 def _parse_target_int_from_funding_band(funding_band) -> int:
     """
@@ -157,6 +225,33 @@ def _pledge_progress_for_listing(listing: Listing) -> dict:
     }
 
 
+def _sniff_mime_type(f) -> str:
+    """
+    Detect an upload's type from its first bytes (at most MIME_SNIFF_BYTES)
+    and rewind the file so storage still saves it from the start.
+    Returns "" when the signature isn't recognised.
+    """
+    head = f.read(MIME_SNIFF_BYTES)
+    f.seek(0)
+
+    # WEBP is RIFF-wrapped: "RIFF" <size:4> "WEBP"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+
+    for signature, mime in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    return ""
+
+
+def _is_image_mime(content_type: str) -> bool:
+    return content_type.startswith("image/")
+
+
+def _is_document_mime(content_type: str) -> bool:
+    return content_type in ALLOWED_DOCUMENT_MIME_TYPES
+
+
 def validate_uploaded_files(
     files,
     *,
@@ -164,16 +259,16 @@ def validate_uploaded_files(
     max_size,
     label,
     allowed_exts_label,
-    mime_prefix=None,
-    mime_types=None,
+    mime_ok,
 ):
-    # Shared validator for images and documents
+    # Shared validator for images and documents;
+    # mime_ok is a predicate over the sniffed MIME type
     for f in files:
         filename = f.name
-        ext = filename.rsplit(".", 1)[-1].lower()
+        _, dot, ext = filename.rpartition(".")
 
         # Extension validation
-        if ext not in allowed_exts:
+        if not dot or ext.lower() not in allowed_exts:
             raise ValueError(
                 f"{label}: {filename} — "
                 f"only {allowed_exts_label} files are allowed."
@@ -184,20 +279,132 @@ def validate_uploaded_files(
             mb = max_size // (1024 * 1024)
             raise ValueError(f"{label}: {filename} — max size is {mb}MB.")
 
-        # MIME validation
-        content_type = (getattr(f, "content_type", "") or "").lower()
-
-        if mime_prefix and not content_type.startswith(mime_prefix):
+        # MIME validation against the sniffed type, not the client header
+        if not mime_ok(_sniff_mime_type(f)):
             raise ValueError(
                 f"{label}: {filename} — only "
                 f"{allowed_exts_label} files are allowed."
             )
 
-        if mime_types and content_type not in mime_types:
-            raise ValueError(
-                f"{label}: {filename} — only "
-                f"{allowed_exts_label} files are allowed."
-            )
+
+def _store_uploaded_media(listing: Listing, images, documents) -> list:
+    """
+    Write uploaded files to storage and return the unsaved ListingMedia
+    rows for them. Storage writes are network round-trips on Cloudinary,
+    so this runs outside any DB transaction; if one fails, files already
+    stored by this call are removed before re-raising.
+    """
+    media_objs = [
+        ListingMedia(
+            listing=listing,
+            file=image,
+            media_type=ListingMedia.MediaType.IMAGE,
+        )
+        for image in images
+    ] + [
+        ListingMedia(
+            listing=listing,
+            file=doc,
+            media_type=ListingMedia.MediaType.DOCUMENT,
+        )
+        for doc in documents
+    ]
+
+    stored = []
+    try:
+        for media in media_objs:
+            # Stores under listing_media_upload_to and marks the file
+            # committed, so bulk_create's pre_save won't upload it again
+            media.file.save(media.file.name, media.file.file, save=False)
+            stored.append(media)
+    except Exception:
+        _delete_stored_files(stored)
+        raise
+    return media_objs
+
+
+def _save_listing_with_media(listing: Listing, images, documents) -> None:
+    """
+    Save the listing and its uploads. Only the DB writes run inside
+    transaction.atomic() (one INSERT for all media rows); if they roll
+    back, the stored files, and a listing created here, are removed too.
+    """
+    created = listing.pk is None
+    if created:
+        # The upload path needs the listing id
+        listing.save()
+
+    try:
+        media_objs = _store_uploaded_media(listing, images, documents)
+    except Exception:
+        if created:
+            listing.delete()
+        raise
+
+    try:
+        with transaction.atomic():
+            if not created:
+                listing.save()
+            if media_objs:
+                ListingMedia.objects.bulk_create(media_objs, batch_size=100)
+    except Exception:
+        _delete_stored_files(media_objs)
+        if created:
+            listing.delete()
+        raise
+
+
+def _delete_stored_files(media_items) -> None:
+    """
+    Remove the backing files for several ListingMedia rows. Each delete is
+    a network round-trip on remote storage (Cloudinary), so they run on a
+    small thread pool rather than one after another. Failures are logged
+    and skipped; the DB rows are deleted by the caller regardless.
+    """
+    names = [m.file.name for m in media_items if m.file]
+    if not names:
+        return
+
+    storage = ListingMedia._meta.get_field("file").storage
+
+    def _delete(name):
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning("Failed to delete stored file %s", name, exc_info=True)
+
+    if len(names) == 1:
+        _delete(names[0])
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=min(STORAGE_DELETE_WORKERS, len(names))
+    ) as pool:
+        list(pool.map(_delete, names))
+
+
+def _split_media_prefetches() -> tuple[Prefetch, Prefetch]:
+    """
+    Prefetch images and documents into listing.image_list /
+    listing.document_list (ordered by upload time) so detail pages
+    don't re-query media after loading the listing.
+    """
+    return (
+        Prefetch(
+            "media",
+            queryset=ListingMedia.objects.filter(
+                media_type=ListingMedia.MediaType.IMAGE
+            ).order_by("uploaded_at"),
+            to_attr="image_list",
+        ),
+        Prefetch(
+            "media",
+            queryset=ListingMedia.objects.filter(
+                media_type=ListingMedia.MediaType.DOCUMENT
+            ).order_by("uploaded_at"),
+            to_attr="document_list",
+        ),
+    )
 
 
 def _is_filled(value) -> bool:
@@ -290,7 +497,11 @@ def _listing_step_flags(listing: Listing) -> dict:
         and _is_filled(listing.county)
         and _is_filled(listing.postcode_prefix)
     )
-    step5 = listing.media.exists()  # DB truth: at least one upload
+    # DB truth: at least one upload (reuse split prefetch when present)
+    if hasattr(listing, "image_list"):
+        step5 = bool(listing.image_list or listing.document_list)
+    else:
+        step5 = listing.media.exists()
     step6 = listing.status == Listing.Status.ACTIVE
     can_activate = step1 and step2 and step3 and step4 and step5 and not step6
 
@@ -342,6 +553,7 @@ def _assign_field_from_raw(listing: Listing, field_name: str, raw) -> None:
     - Empty -> None OR "" depending on
     DB nullability (prevents NOT NULL crashes)
     - duration_days/project_duration_days -> int coercion
+    - country -> lowercased choice key
     - everything else -> raw string
     """
     # Used for save_draft actions where partial forms are allowed
@@ -371,6 +583,12 @@ def _assign_field_from_raw(listing: Listing, field_name: str, raw) -> None:
             setattr(listing, field_name, None)
         return
 
+    # Country choice keys are lowercase; drafts skip form validation, so
+    # normalise here to keep the exact-match search filter working
+    if field_name == "country":
+        setattr(listing, field_name, raw.lower())
+        return
+
     # Everything else: store as raw value
     setattr(listing, field_name, raw)
 
@@ -479,12 +697,18 @@ def create_listing_view(request):
         # Validate files up-front so draft saving
         # doesn't accept disallowed files
         try:
+            # BoundedUploadHandler stopped reading an oversized file
+            if getattr(request, "upload_limit_exceeded", False):
+                raise ValueError(
+                    "Uploads: a file exceeded the "
+                    f"{settings.MAX_UPLOAD_FILE_SIZE // (1024 * 1024)}MB limit."
+                )
             if images:
                 validate_uploaded_files(
                     images,
                     allowed_exts=ALLOWED_IMAGE_EXTENSIONS,
                     max_size=MAX_IMAGE_SIZE,
-                    mime_prefix="image/",
+                    mime_ok=_is_image_mime,
                     label="Images",
                     allowed_exts_label="JPG, PNG or WEBP",
                 )
@@ -493,7 +717,7 @@ def create_listing_view(request):
                     documents,
                     allowed_exts=ALLOWED_DOCUMENT_EXTENSIONS,
                     max_size=MAX_DOCUMENT_SIZE,
-                    mime_types=ALLOWED_DOCUMENT_MIME_TYPES,
+                    mime_ok=_is_document_mime,
                     label="Documents",
                     allowed_exts_label="PDF, DOC or DOCX",
                 )
@@ -529,21 +753,8 @@ def create_listing_view(request):
                 raw = request.POST.get(field_name)
                 _assign_field_from_raw(listing, field_name, raw)
 
-            listing.save()
-
-            # Persist uploads to ListingMedia table
-            for image in images:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=image,
-                    media_type=ListingMedia.MediaType.IMAGE,
-                )
-            for doc in documents:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=doc,
-                    media_type=ListingMedia.MediaType.DOCUMENT,
-                )
+            # Listing row and its uploads are saved (or removed) together
+            _save_listing_with_media(listing, images, documents)
 
             messages.success(
                 request,
@@ -569,21 +780,9 @@ def create_listing_view(request):
             listing.owner = request.user
             listing.status = Listing.Status.DRAFT
             reset_payment_state(listing)
-            listing.save()
 
             # Save uploads before activation readiness check
-            for image in images:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=image,
-                    media_type=ListingMedia.MediaType.IMAGE,
-                )
-            for doc in documents:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=doc,
-                    media_type=ListingMedia.MediaType.DOCUMENT,
-                )
+            _save_listing_with_media(listing, images, documents)
 
             # Enforce Steps 1–5 complete
             if not _listing_ready_for_activation(listing):
@@ -621,23 +820,19 @@ def create_listing_view(request):
 def edit_listing_view(request, pk):
     # Owner-only edit page for drafts
     listing = get_object_or_404(
-        Listing.objects.prefetch_related("media"),
+        Listing.objects.prefetch_related(*_split_media_prefetches()),
         pk=pk,
         owner=request.user,
     )
 
     # Hard gate: only drafts editable
-    if listing.status != Listing.Status.DRAFT:
+    if not listing.is_editable():
         messages.error(request, "Only draft listings can be edited.")
         return redirect("listings:listing_detail", pk=listing.pk)
 
     # Existing uploads split by type for UI tabs and counts
-    images_qs = listing.media.filter(
-        media_type=ListingMedia.MediaType.IMAGE
-    ).order_by("uploaded_at")
-    documents_qs = listing.media.filter(
-        media_type=ListingMedia.MediaType.DOCUMENT
-    ).order_by("uploaded_at")
+    images_qs = listing.image_list
+    documents_qs = listing.document_list
 
     if request.method == "POST":
         action = (request.POST.get("action") or "save_draft").strip()
@@ -650,12 +845,18 @@ def edit_listing_view(request, pk):
 
         # Validate uploaded files before saving updates
         try:
+            # BoundedUploadHandler stopped reading an oversized file
+            if getattr(request, "upload_limit_exceeded", False):
+                raise ValueError(
+                    "Uploads: a file exceeded the "
+                    f"{settings.MAX_UPLOAD_FILE_SIZE // (1024 * 1024)}MB limit."
+                )
             if images:
                 validate_uploaded_files(
                     images,
                     allowed_exts=ALLOWED_IMAGE_EXTENSIONS,
                     max_size=MAX_IMAGE_SIZE,
-                    mime_prefix="image/",
+                    mime_ok=_is_image_mime,
                     label="Images",
                     allowed_exts_label="JPG, PNG or WEBP",
                 )
@@ -664,7 +865,7 @@ def edit_listing_view(request, pk):
                     documents,
                     allowed_exts=ALLOWED_DOCUMENT_EXTENSIONS,
                     max_size=MAX_DOCUMENT_SIZE,
-                    mime_types=ALLOWED_DOCUMENT_MIME_TYPES,
+                    mime_ok=_is_document_mime,
                     label="Documents",
                     allowed_exts_label="PDF, DOC or DOCX",
                 )
@@ -695,21 +896,9 @@ def edit_listing_view(request, pk):
 
             # Reset payment fields if any draft fields changed
             reset_payment_state(listing)
-            listing.save()
 
             # Append new uploads if present
-            for image in images:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=image,
-                    media_type=ListingMedia.MediaType.IMAGE,
-                )
-            for doc in documents:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=doc,
-                    media_type=ListingMedia.MediaType.DOCUMENT,
-                )
+            _save_listing_with_media(listing, images, documents)
 
             messages.success(request,
                              "Draft updated. You can keep editing anytime.")
@@ -739,21 +928,9 @@ def edit_listing_view(request, pk):
             # Save validated fields and reset payment state before checkout
             listing = form.save(commit=False)
             reset_payment_state(listing)
-            listing.save()
 
             # Save any newly uploaded files
-            for image in images:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=image,
-                    media_type=ListingMedia.MediaType.IMAGE,
-                )
-            for doc in documents:
-                ListingMedia.objects.create(
-                    listing=listing,
-                    file=doc,
-                    media_type=ListingMedia.MediaType.DOCUMENT,
-                )
+            _save_listing_with_media(listing, images, documents)
 
             # Must meet Steps 1–5 before activation
             if not _listing_ready_for_activation(listing):
@@ -793,17 +970,13 @@ def edit_listing_view(request, pk):
 def listing_detail_view(request, pk):
     # Owner-only listing detail page (shows uploads and pledge progress)
     listing = get_object_or_404(
-        Listing.objects.prefetch_related("media"),
+        Listing.objects.prefetch_related(*_split_media_prefetches()),
         pk=pk,
         owner=request.user,
     )
 
-    images = listing.media.filter(
-        media_type=ListingMedia.MediaType.IMAGE
-    ).order_by("uploaded_at")
-    documents = listing.media.filter(
-        media_type=ListingMedia.MediaType.DOCUMENT
-    ).order_by("uploaded_at")
+    images = listing.image_list
+    documents = listing.document_list
     # Provides pledged/remaining/target/progress_pct
     pledge_ctx = _pledge_progress_for_listing(listing)
 
@@ -839,11 +1012,7 @@ def listing_delete_view(request, pk):
         return redirect("listings:listing_detail", pk=pk)
 
     # Delete backing files first, then delete DB rows
-    for m in listing.media.all():
-        try:
-            m.file.delete(save=False)
-        except Exception:
-            pass
+    _delete_stored_files(listing.media.all())
     listing.media.all().delete()
 
     listing.delete()
@@ -855,20 +1024,30 @@ def listing_delete_view(request, pk):
 @login_required
 @require_POST
 def listing_media_delete_view(request, pk, media_id):
-    # Owner deletes a single uploaded file
-    listing = get_object_or_404(Listing, pk=pk, owner=request.user)
-
-    if listing.status != Listing.Status.DRAFT:
-        messages.error(request, "Only draft listings can be edited.")
-        return redirect("listings:listing_detail", pk=listing.pk)
-
-    media = get_object_or_404(ListingMedia, pk=media_id, listing=listing)
+    # Owner deletes a single uploaded file. Ownership and editability
+    # are checked in the WHERE clause, so the happy path is one query
+    media = ListingMedia.objects.filter(
+        pk=media_id,
+        listing_id=pk,
+        listing__owner=request.user,
+        listing__status__in=Listing.EDITABLE_STATUSES,
+    ).first()
+
+    if media is None:
+        # Only the unhappy path pays for working out which error to show
+        listing = get_object_or_404(
+            Listing.objects.only("pk", "status"), pk=pk, owner=request.user
+        )
+        if not listing.is_editable():
+            messages.error(request, "Only draft listings can be edited.")
+            return redirect("listings:listing_detail", pk=pk)
+        raise Http404("No ListingMedia matches the given query.")
 
     media.file.delete(save=False)  # Remove physical file
     media.delete()                 # Remove DB row
 
     messages.success(request, "File deleted.")
-    return redirect("listings:edit_listing", pk=listing.pk)
+    return redirect("listings:edit_listing", pk=pk)
 
 @never_cache
 @login_required
@@ -1017,20 +1196,19 @@ def payment_success_view(request):
 @never_cache
 @login_required
 def payment_cancel_view(request, pk):
-    # Cancel redirect target (user-facing): keeps listing as draft
-    listing = get_object_or_404(Listing, pk=pk, owner=request.user)
+    # Cancel redirect target (user-facing): keeps listing as draft.
+    # A single guarded UPDATE: repeat visits are no-ops and a late
+    # cancel can't reset a listing the webhook has already activated
+    updated = Listing.objects.filter(
+        pk=pk,
+        owner=request.user,
+        status__in=Listing.EDITABLE_STATUSES,
+    ).update(**PAYMENT_RESET_VALUES)
 
-    reset_payment_state(listing)
-    listing.save(
-        update_fields=[
-            "status",
-            "expected_amount_pence",
-            "paid_amount_pence",
-            "paid_at",
-            "stripe_checkout_session_id",
-            "stripe_payment_intent_id",
-        ]
-    )
+    if not updated:
+        # Still 404 for listings the user doesn't own
+        get_object_or_404(Listing.objects.only("pk"), pk=pk, owner=request.user)
+        return redirect("listings:listing_detail", pk=pk)
 
     messages.info(request, "Payment cancelled. "
                            "Your listing is still saved as a draft.")
@@ -1045,19 +1223,24 @@ def stripe_webhook(request):
         # Matches StripeWebhookTests expectation
         return HttpResponse(status=400)
 
-    stripe.api_key = settings.STRIPE_SECRET_KEY
-
     payload = request.body
     sig_header = request.META.get("HTTP_STRIPE_SIGNATURE", "")
 
-    # Verify signature and parse event
+    # Verify signature before looking at the body at all
     try:
-        event = stripe.Webhook.construct_event(
-            payload=payload,
-            sig_header=sig_header,
-            secret=settings.STRIPE_WEBHOOK_SECRET,
+        verify_stripe_signature(
+            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
         )
-    except Exception:
+    except ValueError:
+        return HttpResponse(status=400)
+
+    # Most deliveries are event types we ignore; skip parsing those
+    if WEBHOOK_EVENT_PROBE not in payload:
+        return HttpResponse(status=200)
+
+    try:
+        event = orjson.loads(payload)
+    except orjson.JSONDecodeError:
         return HttpResponse(status=400)
 
     if event["type"] == "checkout.session.completed":
@@ -1076,50 +1259,63 @@ def stripe_webhook(request):
 
         session_id = session.get("id")
 
-        # Lock listing row to avoid double activation
-        with transaction.atomic():
-            listing = (
-                Listing.objects
-                .select_for_update()
-                .filter(pk=listing_id)
-                .first()
-            )
-            if not listing:
-                return HttpResponse(status=200)
-
-            if listing.status == Listing.Status.ACTIVE:
-                return HttpResponse(status=200)
-
-            # Safety: ignore if webhook session
-            # doesn't match the one we created
-            if (
-                listing.stripe_checkout_session_id
-                and session_id != listing.stripe_checkout_session_id
-            ):
-                return HttpResponse(status=200)
-
-            activate_listing_from_paid_session(
-                listing=listing,
-                session=session,
-            )
+        # No row lock: activation is a conditional UPDATE that no-ops
+        # for duplicate or concurrent deliveries (Stripe retries)
+        listing = Listing.objects.filter(pk=listing_id).first()
+        if not listing:
+            return HttpResponse(status=200)
+
+        if listing.status == Listing.Status.ACTIVE:
+            return HttpResponse(status=200)
+
+        # Safety: ignore if webhook session
+        # doesn't match the one we created
+        if (
+            listing.stripe_checkout_session_id
+            and session_id != listing.stripe_checkout_session_id
+        ):
+            return HttpResponse(status=200)
+
+        activate_listing_from_paid_session(
+            listing=listing,
+            session=session,
+        )
 
     return HttpResponse(status=200)
 
-@never_cache
-@login_required
+
+def _counties_payload(request) -> bytes:
+    country = (request.GET.get("country") or "").strip().lower()
+    return _COUNTIES_JSON.get(country, _NO_COUNTIES_JSON)
+
+
+def _outcodes_payload(request) -> bytes:
+    county = (request.GET.get("county") or "").strip()
+    return _OUTCODES_JSON.get(county, _NO_OUTCODES_JSON)
+
+
+def _static_json_response(body: bytes) -> HttpResponse:
+    # Location data is public and only changes on deploy
+    return HttpResponse(
+        body,
+        content_type="application/json",
+        headers={"Cache-Control": LOCATION_API_CACHE_CONTROL},
+    )
+
+
 @require_GET
+@condition(etag_func=lambda request: _LOCATION_ETAGS[_counties_payload(request)])
 def api_counties(request):
     # Used by JS dropdowns: given country -> counties list
-    country = (request.GET.get("country") or "").strip().lower()
-    return JsonResponse({"counties": COUNTIES_BY_COUNTRY.get(country, [])})
+    return _static_json_response(_counties_payload(request))
+
 
-@never_cache
-@login_required
 @require_GET
+@condition(etag_func=lambda request: _LOCATION_ETAGS[_outcodes_payload(request)])
 def api_outcodes(request):
     # Used by JS dropdowns: given county -> postcode outcodes list
-    county = (request.GET.get("county") or "").strip()
-    return JsonResponse({"outcodes": OUTCODES_BY_COUNTY.get(county, [])})
+    return _static_json_response(_outcodes_payload(request))
+
 
 @never_cache
 @login_required
@@ -1145,8 +1341,11 @@ def search_listings_view(request):
         .exclude(owner=request.user)
         # Used for "listed by" display
         .select_related("owner")
-        # Used for media.count in template
-        .prefetch_related("media")
+        # Only the columns the result cards (and pledge progress) read
+        .only(*SEARCH_CARD_FIELDS)
+        # Cards only show a file count, so count in SQL
+        # instead of prefetching every media row
+        .annotate(media_count=Count("media"))
         .order_by("-created_at")
     )
 
@@ -1167,7 +1366,10 @@ def search_listings_view(request):
         qs = qs.filter(target_use=target_use)
 
     if country:
-        qs = qs.filter(country__iexact=country)
+        # Input is lowercased and stored values are lowercase choice keys
+        # (drafts are normalised on save, older rows by migration 0005),
+        # so an exact match can use listing_active_filters_idx
+        qs = qs.filter(country=country)
 
     if county:
         qs = qs.filter(county__iexact=county)
@@ -1198,11 +1400,6 @@ def search_listings_view(request):
         except Exception:
             listing.progress_pct = 0
 
-    # Choices used to render dropdowns with current selection
-    source_use_choices = Listing._meta.get_field("source_use").choices
-    target_use_choices = Listing._meta.get_field("target_use").choices
-    return_band_choices = Listing._meta.get_field("return_band").choices
-
     return render(
         request,
         "listings/search_listings.html",
@@ -1218,31 +1415,30 @@ def search_listings_view(request):
             "return_type": return_type,
             "return_band": return_band,
             "page_obj": page_obj,
-            "source_use_choices": source_use_choices,
-            "target_use_choices": target_use_choices,
-            "country_choices": Listing.Country.choices,
-            "funding_band_choices": Listing.FundingBand.choices,
-            "return_type_choices": Listing.ReturnType.choices,
-            "return_band_choices": return_band_choices,
+            # Choices used to render dropdowns with current selection
+            "source_use_choices": Listing.USE_TYPE_CHOICES,
+            "target_use_choices": Listing.USE_TYPE_CHOICES,
+            "country_choices": Listing.COUNTRY_CHOICES,
+            "funding_band_choices": Listing.FUNDING_BAND_CHOICES,
+            "return_type_choices": Listing.RETURN_TYPE_CHOICES,
+            "return_band_choices": Listing.RETURN_BAND_CHOICES,
         },
     )
 
 @never_cache
 @login_required
 def opportunity_detail_view(request, pk):
-    # Investor-facing listing page
+    # Investor-facing listing page (owner shown as "listed by")
     listing = get_object_or_404(
-        Listing.objects.prefetch_related("media"),
+        Listing.objects.select_related("owner").prefetch_related(
+            *_split_media_prefetches()
+        ),
         pk=pk,
         status=Listing.Status.ACTIVE,
     )
 
-    images = listing.media.filter(
-        media_type=ListingMedia.MediaType.IMAGE
-    ).order_by("uploaded_at")
-    documents = listing.media.filter(
-        media_type=ListingMedia.MediaType.DOCUMENT
-    ).order_by("uploaded_at")
+    images = listing.image_list
+    documents = listing.document_list
 
     # Pledge progress context
     pledge_ctx = _pledge_progress_for_listing(listing)
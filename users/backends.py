@@ -4,6 +4,17 @@ from django.contrib.auth import get_user_model
 # Get the custom User model
 User = get_user_model()
 
+# Columns loaded for request.user on every authenticated request
+SESSION_USER_FIELDS = (
+    "id",
+    "password",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "email",
+    "first_name",
+)
+
 
 class EmailBackend(ModelBackend):
     """
@@ -27,11 +38,15 @@ class EmailBackend(ModelBackend):
             - None if authentication fails.
         """
         try:
-            # Try to find a user with the provided email (case-insensitive)
-            user = User.objects.get(email__iexact=username)
+            # Try to find a user with the provided email (case-insensitive),
+            # loading only what the password and active checks need
+            user = User.objects.only("id", "password", "is_active").get(
+                email__iexact=username
+            )
         except User.DoesNotExist:
-            # If no user exists with that email,
-            # return None (authentication failed)
+            # Run the password hasher once anyway so a missing email takes
+            # as long as a wrong password (no timing oracle for accounts)
+            User().set_password(password)
             return None
         else:
             # Check if the password is correct and
@@ -42,3 +57,16 @@ class EmailBackend(ModelBackend):
                 return user
 
         return None
+
+    def get_user(self, user_id):
+        """
+        Load the session's user on each authenticated request, fetching
+        only the columns the request path reads: the password (session
+        hash check), the active/staff flags, and the name and email shown
+        in the navigation.
+        """
+        try:
+            user = User.objects.only(*SESSION_USER_FIELDS).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
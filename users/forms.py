@@ -21,7 +21,10 @@ class CustomUserCreationForm(UserCreationForm):
 
     def clean_email(self):
         """
-        Normalise the email and enforce uniqueness.
+        Normalise the email.
+
+        Uniqueness is enforced on save by the unique LOWER(email) index
+        (users/migrations/0001), so no pre-check query is needed here.
         """
         email = (self.cleaned_data.get("email") or "").strip().lower()
 
@@ -29,11 +32,6 @@ class CustomUserCreationForm(UserCreationForm):
         if not email:
             raise forms.ValidationError("Email is required.")
 
-        # Prevent duplicate accounts
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError("A user with this "
-                                        "email already exists.")
-
         return email
 
     def save(self, commit=True):
@@ -76,13 +74,10 @@ class CustomAuthenticationForm(AuthenticationForm):
 
     def clean_username(self):
         """
-        Normalise the email and provide
-        a clear error if no matching account exists.
-        """
-        email = (self.cleaned_data.get("username") or "").strip().lower()
+        Normalise the email.
 
-        # Friendly validation before authentication runs
-        if not User.objects.filter(email=email).exists():
-            raise forms.ValidationError("No account found with this email.")
-
-        return email
+        Whether an account exists is left to authenticate(), which does
+        the only user lookup; a pre-check here would cost a query and
+        reveal which emails are registered.
+        """
+        return (self.cleaned_data.get("username") or "").strip().lower()
@@ -0,0 +1,13 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id tuned for a small web dyno: 64 MiB and 2 lanes instead of
+    Django's 100 MiB / 8 lanes. Listed first in PASSWORD_HASHERS, so
+    existing PBKDF2 hashes are upgraded on the user's next login.
+    """
+
+    time_cost = 2
+    memory_cost = 65536  # KiB (64 MiB)
+    parallelism = 2
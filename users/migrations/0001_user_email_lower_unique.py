@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations
+
+# Sign-ups set username = email, but admin/createsuperuser accounts need
+# not, so the unique username index alone can't stop two accounts sharing
+# an email (which EmailBackend's email__iexact lookup can't tell apart).
+# A unique index on LOWER(email) makes the database the single check;
+# blank emails (allowed for admin-created users) are left out.
+INDEX_NAME = "user_email_lower_uniq"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"CREATE UNIQUE INDEX {INDEX_NAME} ON auth_user (LOWER(email)) "
+            "WHERE email <> ''",
+            f"DROP INDEX IF EXISTS {INDEX_NAME}",
+        ),
+    ]
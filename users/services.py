@@ -1,27 +1,94 @@
 # users/services.py
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.db.models import Q
 
-from .models import Listing
+from investments.models import Investment
+from listings.models import Listing
 
+# Seconds a user's pledge figures and rendered investment cards stay
+# cached. Pledge writes invalidate both (see users/signals.py), so this
+# is only a backstop
+DASHBOARD_CACHE_TIMEOUT = 300
 
-def expire_due_listings() -> int:
+# Cache alias for pledge figures and investment cards: shared (Redis) when REDIS_URL is set,
+# otherwise a dummy cache, since a per-process cache would keep serving
+# stale totals in workers that never saw the invalidation
+DASHBOARD_CACHE_ALIAS = "dashboard"
+
+
+def _dashboard_cache_key(user_id) -> str:
+    return f"dashboard:headline:{user_id}"
+
+
+def invalidate_dashboard_cache(*user_ids) -> None:
+    """Drop cached pledge figures and investment cards for the given users."""
+    keys = []
+    for user_id in user_ids:
+        keys.append(_dashboard_cache_key(user_id))
+        # {% cache ... dashboard_investments user.pk using="dashboard" %}
+        # in dashboard.html
+        keys.append(make_template_fragment_key("dashboard_investments", [user_id]))
+    caches[DASHBOARD_CACHE_ALIAS].delete_many(keys)
+
+
+def dashboard_headline(user) -> dict:
+    """
+    Pledge figures for the dashboard headline, in one aggregate query.
+    (Listing counts are taken from the listings the page already loads.)
+
+    Returns:
+        dict: total_pledged_pence, active_investments
+    """
+    return Investment.objects.filter(
+        investor=user, status=Investment.Status.PLEDGED
+    ).aggregate(
+        total_pledged_pence=Coalesce(Sum("amount_pence"), 0),
+        active_investments=Count("listing_id", distinct=True),
+    )
+
+
+def cached_dashboard_headline(user) -> dict:
+    """
+    dashboard_headline(), served from the dashboard cache when a shared
+    backend is configured (otherwise always computed).
+    """
+    return caches[DASHBOARD_CACHE_ALIAS].get_or_set(
+        _dashboard_cache_key(user.pk),
+        lambda: dashboard_headline(user),
+        DASHBOARD_CACHE_TIMEOUT,
+    )
+
+
+def expire_due_listings() -> tuple[int, list[tuple[int, str]]]:
     """
     Expire active listings whose active period has ended.
 
     Returns:
-        int: Number of listings updated.
+        tuple: (number of listings updated, [(listing pk, owner email), ...])
+        so callers can fan out notifications without a query per listing.
     """
     # Current timestamp for comparison
     now = timezone.now()
 
-    # Update all active listings that have an end date in the past
-    updated = (
+    # Capture ids and owner emails in a single two-column SELECT
+    expiring = list(
         Listing.objects
         .filter(status=Listing.Status.ACTIVE)
         .filter(active_until__isnull=False, active_until__lte=now)
+        .values_list("pk", "owner__email")
+    )
+    if not expiring:
+        return 0, []
+
+    # Update only the captured rows that are still active
+    updated = (
+        Listing.objects
+        .filter(pk__in=[pk for pk, _ in expiring], status=Listing.Status.ACTIVE)
         .update(status=Listing.Status.EXPIRED)
     )
 
-    # Return the count of updated records
-    return updated
+    # Return the count of updated records and the notification payload
+    return updated, expiring
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model, user_logged_in
+from django.contrib.auth.models import update_last_login
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from investments.models import Investment
+
+from .services import invalidate_dashboard_cache
+
+
+# Any saved or deleted pledge can change its investor's dashboard figures
+# and investment cards (deleting a listing cascades to its pledges, which
+# fires this too). Invalidate only once the write commits; deleting inside
+# the transaction would let a concurrent dashboard load re-cache the old
+# figures before the pledge is visible
+@receiver([post_save, post_delete], sender=Investment)
+def investment_changed(sender, instance, **kwargs):
+    investor_id = instance.investor_id
+    transaction.on_commit(lambda: invalidate_dashboard_cache(investor_id))
+
+
+# Django's default handler calls user.save(update_fields=["last_login"]),
+# which fires pre/post_save for the user on every login. A single UPDATE
+# by pk records the same timestamp without the model save round.
+user_logged_in.disconnect(update_last_login, dispatch_uid="update_last_login")
+
+
+@receiver(user_logged_in, dispatch_uid="users_record_last_login")
+def record_last_login(sender, user, **kwargs):
+    now = timezone.now()
+    get_user_model().objects.filter(pk=user.pk).update(last_login=now)
+    user.last_login = now
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from decimal import Decimal
 import logging
 
 from django.contrib import messages
 from django.contrib.auth import login, logout, authenticate, get_user_model
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
-from django.db.models.functions import Coalesce
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.shortcuts import render, redirect
 from django.views.decorators.cache import never_cache
 
@@ -15,11 +14,68 @@ from investments.models import Investment
 from listings.models import Listing
 
 from .forms import CustomUserCreationForm, CustomAuthenticationForm
+from .services import DASHBOARD_CACHE_TIMEOUT, cached_dashboard_headline
 
 # Module logger and user model reference
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Columns the dashboard cards render; everything else stays in the DB
+DASHBOARD_LISTING_FIELDS = (
+    "id",
+    "project_name",
+    "status",
+    "source_use",
+    "target_use",
+    "country",
+    "county",
+    "postcode_prefix",
+    "funding_band",
+    "return_type",
+    "return_band",
+    "duration_days",
+    "active_until",
+)
+DASHBOARD_INVESTMENT_FIELDS = (
+    "id",
+    "amount_pence",
+    "expected_return_pence",
+    "expected_total_back_pence",
+    "created_at",
+    "listing__id",
+    "listing__source_use",
+    "listing__target_use",
+    "listing__country",
+    "listing__county",
+    "listing__postcode_prefix",
+    "listing__return_type",
+    "listing__return_band",
+    "listing__project_duration_days",
+)
+
+# Choice labels for the listing cards, which render plain dicts rather
+# than model instances (so no get_FOO_display() per row)
+DASHBOARD_LISTING_LABELS = {
+    "funding_band": dict(Listing.FUNDING_BAND_CHOICES),
+    "return_type": dict(Listing.RETURN_TYPE_CHOICES),
+    "return_band": dict(Listing.RETURN_BAND_CHOICES),
+}
+
+# The dashboard queries have a fixed shape, so build them once here; the
+# view only adds the per-user filter, which clones and is never evaluated
+# on these module-level querysets
+DASHBOARD_LISTINGS = (
+    Listing.objects.annotate(media_count=Count("media"))
+    .order_by("-created_at")
+    .values(*DASHBOARD_LISTING_FIELDS, "media_count")
+)
+DASHBOARD_INVESTMENTS = (
+    Investment.objects.filter(status=Investment.Status.PLEDGED)
+    .select_related("listing")
+    .only(*DASHBOARD_INVESTMENT_FIELDS)
+    .order_by("-created_at")
+)
+
 
 # LOGIN
 @never_cache
@@ -27,42 +83,43 @@ def login_view(request):
     """
     Render the login/register screen and handle login submissions.
     """
-    # Forms shown on the combined login page
-    login_form = CustomAuthenticationForm(request, data=request.POST or None)
-    register_form = CustomUserCreationForm()
+    # Prefill for the login form when a submission is re-rendered
+    login_initial = None
 
     # Login submission
     if request.method == "POST" and "login_submit" in request.POST:
         # Normalise credentials
         email = request.POST.get("username", "").strip().lower()
         password = request.POST.get("password", "")
+        login_initial = {"username": email}
 
         # Basic validation before attempting authentication
         if not email or not password:
             messages.error(request, "Please enter your registered email and password to login.")
         else:
-            # Friendly message if the email is not registered
-            user_exists = User.objects.filter(email=email).exists()
-            if not user_exists:
-                messages.error(request, "There is no account associated with the email address.")
-            else:
-                # Authenticate using email as the username identifier
-                user_auth = authenticate(request, username=email, password=password)
-                if user_auth is not None:
-                    # Log the user in using the custom email backend
-                    login(request, user_auth, backend="users.backends.EmailBackend")
-                    messages.success(request, "Logged in successfully!")
-                    return redirect("users:dashboard")
-                else:
-                    messages.error(request, "You have entered your password incorrectly.")
-
-    # Default: render page
+            # Authenticate first; the backend does the single user lookup
+            user_auth = authenticate(request, username=email, password=password)
+            if user_auth is not None:
+                # Log the user in using the custom email backend. No success
+                # message: landing on the dashboard is the feedback, and it
+                # saves writing (then clearing) a messages cookie
+                login(request, user_auth, backend="users.backends.EmailBackend")
+                return redirect("users:dashboard")
+
+            # Same message whether the email or the password was wrong,
+            # so the page can't be used to discover registered emails
+            messages.error(request, "Invalid email or password.")
+
+    # Default: render page. Forms are built only here, not before a
+    # successful login redirect. The login form is left unbound: errors
+    # go through messages, and a bound AuthenticationForm would re-run
+    # its own lookup + authenticate() when rendered.
     return render(
         request,
         "users/login.html",
         {
-            "login_form": login_form,
-            "register_form": register_form,
+            "login_form": CustomAuthenticationForm(request, initial=login_initial),
+            "register_form": CustomUserCreationForm(),
             "show_form": "login",
         },
     )
@@ -74,31 +131,35 @@ def register_view(request):
     """
     Render the login/register screen and handle registration submissions.
     """
-    # Forms shown on the combined register page
-    login_form = CustomAuthenticationForm(request)
+    # Registration form (bound on submission)
     register_form = CustomUserCreationForm(request.POST or None)
 
     # Register submission
     if request.method == "POST" and "register_submit" in request.POST:
         if register_form.is_valid():
-            # Create user without saving so we can ensure username is set
-            user = register_form.save(commit=False)
-            user.username = user.email
-            user.save()
-
-            # Auto-login after successful registration
-            login(request, user, backend="users.backends.EmailBackend")
-            messages.success(request, "Registered and logged in successfully!")
-            return redirect("users:dashboard")
-        else:
-            messages.error(request, "Please correct the errors below.")
+            # Duplicate emails trip the unique LOWER(email) index (or the
+            # username index, since username = email) and are reported here
+            try:
+                with transaction.atomic():
+                    user = register_form.save()
+            except IntegrityError:
+                register_form.add_error(
+                    "email", "A user with this email already exists."
+                )
+            else:
+                # Auto-login after successful registration (the dashboard
+                # is the confirmation, as for login)
+                login(request, user, backend="users.backends.EmailBackend")
+                return redirect("users:dashboard")
+
+        messages.error(request, "Please correct the errors below.")
 
-    # Default: render page
+    # Default: render page (the login tab's form is only needed here)
     return render(
         request,
         "users/register.html",
         {
-            "login_form": login_form,
+            "login_form": CustomAuthenticationForm(request),
             "register_form": register_form,
             "show_form": "register",
         },
@@ -123,34 +184,35 @@ def dashboard_view(request):
     """
     Show the user a summary of their listings and pledged investments.
     """
-    # User-owned listings
-    listings = (
-        Listing.objects.filter(owner=request.user)
-        .prefetch_related("media")
-        .order_by("-created_at")
-    )
-
-    # User investments
-    investments = (
-        Investment.objects.filter(investor=request.user, status=Investment.Status.PLEDGED)
-        .select_related("listing")
-        .prefetch_related("listing__media")
-        .order_by("-created_at")
-    )
+    # User-owned listings as plain dicts: the cards only read flat values,
+    # so rows skip model instantiation and template lookups are dict hits.
+    # Media is counted in SQL rather than prefetching every media row
+    listings = list(DASHBOARD_LISTINGS.filter(owner=request.user))
+    for row in listings:
+        for field, labels in DASHBOARD_LISTING_LABELS.items():
+            # Same fallback as get_FOO_display(): unknown values show as-is
+            row[f"{field}_label"] = labels.get(row[field], row[field])
+
+    # User investments (investment cards render no media). Left lazy:
+    # it is only queried when the cached card fragment has expired
+    investments = DASHBOARD_INVESTMENTS.filter(investor=request.user)
+
+    # Pledge figures in a single query, cached until the user's pledges change
+    headline = cached_dashboard_headline(request.user)
 
     # Total pledged value
-    total_pledged_pence = investments.aggregate(total=Coalesce(Sum("amount_pence"), 0))["total"] or 0
-    total_pledged_gbp = (Decimal(total_pledged_pence) / Decimal("100")).quantize(Decimal("0.01"))
-    total_pledged_gbp_formatted = f"£{total_pledged_gbp:,.2f}"
-
-    # Dashboard headline figures
-    active_investments = investments.values("listing_id").distinct().count()
-    active_listings = listings.filter(status=Listing.Status.ACTIVE).count()
+    # Whole pence, so integer divmod formats exactly without Decimal
+    pounds, pence = divmod(headline["total_pledged_pence"], 100)
+    total_pledged_gbp_formatted = f"£{pounds:,}.{pence:02d}"
 
+    active_investments = headline["active_investments"]
+    active_listings = sum(
+        1 for listing in listings if listing["status"] == Listing.Status.ACTIVE
+    )
     # Draft and awaiting payment listings
-    draft_waiting_payment = listings.filter(
-        status__in=[Listing.Status.DRAFT, Listing.Status.PENDING_PAYMENT]
-    ).count()
+    draft_waiting_payment = sum(
+        1 for listing in listings if listing["status"] in Listing.EDITABLE_STATUSES
+    )
 
     # Render dashboard
     return render(
@@ -163,5 +225,6 @@ def dashboard_view(request):
             "active_investments": active_investments,
             "active_listings": active_listings,
             "draft_waiting_payment": draft_waiting_payment,
+            "dashboard_cache_timeout": DASHBOARD_CACHE_TIMEOUT,
         },
     )